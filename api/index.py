@@ -1,43 +1,36 @@
 from flask import Flask, render_template, jsonify, request
-import sqlite3
 from datetime import datetime
 import os
 from pathlib import Path
 import sys
 
 # Add the parent directory to the path so we can import our modules
-# sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper.database.connection import get_connection_manager
+from scraper.database.migrations import migrate
+from scraper.database.pagination import encode_cursor, jobs_page_query
+from scraper.database.stats import read_job_stats
 
 app = Flask(__name__)
 
+# Use a temporary database for Vercel since it's read-only
+db_path = '/tmp/jobs.db'
+db_connections = get_connection_manager(db_path)
+
 def get_db_connection():
-    """Create a database connection"""
-    # Use a temporary database for Vercel since it's read-only
-    db_path = '/tmp/jobs.db'
-    
+    """Get this thread's persistent read connection"""
     # If database doesn't exist, create a sample one
     if not os.path.exists(db_path):
-        conn = sqlite3.connect(db_path)
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS jobs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                job_id TEXT UNIQUE,
-                title TEXT NOT NULL,
-                company TEXT NOT NULL,
-                location TEXT,
-                salary_min REAL,
-                salary_max REAL,
-                description TEXT,
-                url TEXT NOT NULL,
-                source TEXT NOT NULL,
-                posted_date TEXT,
-                scraped_date TEXT DEFAULT CURRENT_TIMESTAMP,
-                is_new BOOLEAN DEFAULT 1,
-                applied BOOLEAN DEFAULT 0,
-                metadata TEXT
-            )
-        ''')
-        
+        seed_sample_database()
+    return db_connections.reader()
+
+def seed_sample_database():
+    """Create the schema and fill it with sample data"""
+    # Base tables first; the later migrations then backfill, index and count the samples
+    migrate(db_connections, target=1)
+    
+    with db_connections.writer() as conn:
         # Add real Canadian internship data
         sample_jobs = [
             ('real1', 'Software Engineering Intern', 'Shopify', 'Ottawa, Ontario, Canada', None, None, 'Join our engineering team for a 4-month internship', 'https://jobs.shopify.com', 'linkedin', '2025-08-02', '2025-08-02 10:00:00', 1, 0, '{}'),
@@ -56,19 +49,15 @@ def get_db_connection():
              description, url, source, posted_date, scraped_date, is_new, applied, metadata)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', sample_jobs)
-        conn.commit()
-        conn.close()
     
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+    migrate(db_connections)
 
-def get_jobs(limit=None, offset=0, filter_new=False):
-    """Get jobs from database"""
+def get_jobs(limit=20, cursor=None, filter_new=False):
+    """Get a page of jobs, newest first, and the cursor of the next page (None at the end)"""
     conn = get_db_connection()
     
-    query = """
-    SELECT 
+    columns = """
+        id,
         job_id,
         title,
         company,
@@ -78,71 +67,49 @@ def get_jobs(limit=None, offset=0, filter_new=False):
         source,
         scraped_date as created_at,
         is_new
-    FROM jobs
     """
     
-    if filter_new:
-        query += " WHERE is_new = 1"
-    
-    query += " ORDER BY scraped_date DESC"
-    
-    if limit:
-        query += f" LIMIT {limit} OFFSET {offset}"
+    # One walk down the index for the filters, no sort or skip (see jobs_page_query)
+    query, params = jobs_page_query(columns, limit, cursor, filter_new)
+    rows = conn.execute(query, params).fetchall()
+    jobs = [dict(row) for row in rows[:limit]]
     
-    cursor = conn.execute(query)
-    jobs = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor([jobs[-1]['created_at'], jobs[-1]['id']])
+    for job in jobs:
+        del job['id']
     
-    return jobs
+    return jobs, next_cursor
 
 def get_job_stats():
-    """Get job statistics"""
-    conn = get_db_connection()
-    
-    # Total jobs
-    total = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
-    
-    # New jobs
-    new_jobs = conn.execute("SELECT COUNT(*) FROM jobs WHERE is_new = 1").fetchone()[0]
-    
-    # Jobs by source
-    sources = conn.execute("""
-        SELECT source, COUNT(*) as count 
-        FROM jobs 
-        GROUP BY source 
-        ORDER BY count DESC
-    """).fetchall()
-    
-    conn.close()
-    
-    return {
-        'total': total,
-        'new_jobs': new_jobs,
-        'sources': [dict(row) for row in sources]
-    }
+    """Get job statistics from the trigger-maintained rollup"""
+    return read_job_stats(get_db_connection())
 
 @app.route('/')
 def index():
     """Main page showing job dashboard"""
     stats = get_job_stats()
-    recent_jobs = get_jobs(limit=10)
+    recent_jobs, _ = get_jobs(limit=10)
     return render_template('index.html', stats=stats, recent_jobs=recent_jobs)
 
 @app.route('/api/jobs')
 def api_jobs():
     """API endpoint to get jobs"""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
+    per_page = max(1, min(request.args.get('per_page', 20, type=int), 100))
+    cursor = request.args.get('cursor')
     filter_new = request.args.get('new_only', 'false').lower() == 'true'
     
-    offset = (page - 1) * per_page
-    jobs = get_jobs(limit=per_page, offset=offset, filter_new=filter_new)
+    try:
+        jobs, next_cursor = get_jobs(limit=per_page, cursor=cursor, filter_new=filter_new)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     return jsonify({
         'jobs': jobs,
-        'page': page,
         'per_page': per_page,
-        'has_more': len(jobs) == per_page
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None
     })
 
 @app.route('/api/stats')
@@ -153,19 +120,17 @@ def api_stats():
 @app.route('/api/mark-seen/<job_id>')
 def mark_seen(job_id):
     """Mark a job as seen (not new)"""
-    conn = get_db_connection()
-    conn.execute("UPDATE jobs SET is_new = 0 WHERE job_id = ?", (job_id,))
-    conn.commit()
-    conn.close()
+    get_db_connection()
+    with db_connections.writer() as conn:
+        conn.execute("UPDATE jobs SET is_new = 0 WHERE job_id = ?", (job_id,))
     return jsonify({'success': True})
 
 @app.route('/api/mark-all-seen')
 def mark_all_seen():
     """Mark all jobs as seen"""
-    conn = get_db_connection()
-    conn.execute("UPDATE jobs SET is_new = 0")
-    conn.commit()
-    conn.close()
+    get_db_connection()
+    with db_connections.writer() as conn:
+        conn.execute("UPDATE jobs SET is_new = 0")
     return jsonify({'success': True})
 
 @app.route('/api/run-scraper', methods=['POST'])
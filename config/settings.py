@@ -12,10 +12,82 @@ RECIPIENT_EMAIL = os.getenv('RECIPIENT_EMAIL')
 
 # Database Configuration
 DATABASE_PATH = 'data/jobs.db'
+INGEST_BATCH_SIZE = 200  # jobs written per transaction
+DB_BUSY_TIMEOUT_MS = 5000  # how long a connection waits on a lock before failing
+DB_SYNCHRONOUS = 'NORMAL'  # safe with WAL, far fewer fsyncs than FULL
+DB_CACHE_SIZE_KB = 64 * 1024  # page cache per connection
+DB_MMAP_SIZE = 256 * 1024 * 1024  # bytes of the database file memory-mapped
+DB_STATEMENT_CACHE_SIZE = 256  # prepared statements kept per connection
+SEEN_INDEX_BLOOM_ABOVE = 2_000_000  # stored jobs before the seen-ID index becomes a Bloom filter (None = never)
+SEEN_INDEX_FALSE_POSITIVE_RATE = 0.001  # share of new jobs a Bloom filter may wrongly treat as seen
+SEARCH_MAX_CANDIDATES = 1000  # newest matches ranked per search; broad terms skip ranking older ones
+SEARCH_PREFIX_TERMS = 16  # a search's last word is expanded to at most this many indexed words
+
+# Pipeline Configuration (scrape -> filter -> dedupe -> store -> notify, one thread per stage)
+PIPELINE_QUEUE_SIZE = 500  # jobs buffered between two stages before the upstream one waits
+PIPELINE_FLUSH_SECONDS = 2.0  # longest a scraped job waits for its batch to be written
+
+# Archive Configuration (old postings move to a cold database, leaving ID stubs for dedupe)
+ARCHIVE_ENABLED = True  # archive after every scrape
+ARCHIVE_PATH = 'data/archive.db'
+ARCHIVE_AFTER_DAYS = 180  # postings scraped longer ago than this leave the hot table
+ARCHIVE_BATCH_SIZE = 5000  # rows moved per transaction
+
+# Near-Duplicate Configuration (same posting under another URL, source or slightly different title)
+NEAR_DUPLICATE_THRESHOLD = 0.8  # estimated title similarity (Jaccard) above which postings are the same
+NEAR_DUPLICATE_PERMUTATIONS = 64  # MinHash signature length; changing it needs the signatures rebuilt
+NEAR_DUPLICATE_BANDS = 16  # LSH bands (permutations / bands rows each); more bands find more candidates
 
 # Scraping Configuration
 REQUEST_DELAY = 2  # seconds between requests
 MAX_RETRIES = 3
+REQUEST_TIMEOUT = 30  # seconds
+MAX_CONCURRENT_REQUESTS = 16  # requests in flight across all hosts
+MAX_CONCURRENT_PER_HOST = 2  # requests in flight against a single host
+
+# HTML Parsing Configuration ('html.parser', 'lxml' or 'lxml-xpath'; falls back to html.parser without lxml)
+HTML_PARSER_BACKEND = 'lxml-xpath'
+PARSE_WORKERS = None  # parse processes (None = one per CPU, 0 = parse inline)
+
+# Custom URL Selector Profiles
+SELECTOR_PROFILE_MAX_AGE_DAYS = 14  # fully re-probe a site's selectors after this long
+
+# LinkedIn Pagination Configuration (search_params in job_sources.yaml can override)
+LINKEDIN_PAGE_SIZE = 25  # results per search page
+LINKEDIN_MAX_PAGES = 10  # deepest page fetched for a single keyword
+LINKEDIN_PAGE_BUDGET = 60  # total search pages fetched per run
+
+# Query Planner Configuration (keyword x location x experience-level searches)
+QUERY_PLANNER_WINDOW = 5  # recent runs of a query considered
+QUERY_PLANNER_MIN_RUNS = 3  # runs of history needed before a query is down-weighted or skipped
+QUERY_PLANNER_SKIP_RATIO = 0.05  # skip queries whose results are >95% returned by better queries
+QUERY_PLANNER_DOWNWEIGHT_RATIO = 0.25  # only fetch the first page of queries below this
+QUERY_PLANNER_PROBE_EVERY = 5  # re-run a skipped query after this many skipped runs
+
+# Incremental Scraping Configuration (per source and query watermarks)
+INCREMENTAL_SCRAPING = True  # only ask for postings since the last successful run
+WATERMARK_OVERLAP_HOURS = 24  # extra look-back, since posting dates are only known to the day
+WATERMARK_MAX_AGE_DAYS = 30  # older watermarks are ignored and the query is scraped in full
+
+# HTTP Cache Configuration (conditional requests with ETag / Last-Modified)
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_PATH = 'data/http_cache.db'
+HTTP_CACHE_TTL = 7 * 24 * 60 * 60  # seconds before a cached validator is ignored
+HTTP_CACHE_MAX_ENTRIES = 5000
+
+# Raw HTML Snapshot Configuration (content-addressed store used for offline replay)
+SNAPSHOTS_ENABLED = False  # record every fetched page (python main.py --record does this for one run)
+SNAPSHOT_PATH = 'data/snapshots'
+SNAPSHOT_COMPRESSION = 'zstd'  # falls back to gzip when zstandard is not installed
+REPLAY_DATABASE_PATH = 'data/replay.db'  # replays write here unless --db is given, never to DATABASE_PATH
+
+# Rate Limiting Configuration (token bucket per host: rate = requests/second, burst = bucket size)
+# A rate of None disables throttling. Entries also cover subdomains, and can be
+# overridden from the rate_limits section of job_sources.yaml.
+DEFAULT_RATE_LIMIT = {'rate': 1 / REQUEST_DELAY, 'burst': 1}
+HOST_RATE_LIMITS = {
+    'linkedin.com': {'rate': 0.3, 'burst': 2}
+}
 USER_AGENTS = [
     'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
     'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
@@ -1,8 +1,10 @@
+import argparse
 import yaml
 import logging
 import subprocess
 import sys
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 from typing import List, Dict
 
@@ -10,20 +12,44 @@ from scraper.database.models import JobDatabase
 from scraper.scrapers.linkedin_scraper import LinkedInScraper
 from scraper.scrapers.custom_scraper import CustomScraper
 from scraper.notifications.email_notifier import EmailNotifier
-from config.settings import DATABASE_PATH, LOG_FILE, LOG_LEVEL
+from scraper.fetching.fetcher import AsyncFetcher
+from scraper.fetching.rate_limiter import get_rate_limiter
+from scraper.fetching.snapshots import SnapshotStore
+from scraper.database.archive import get_job_archive
+from scraper.filtering.job_filter import JobFilter
+from scraper.pipeline import JobPipeline
+from config.settings import (
+    ARCHIVE_AFTER_DAYS, ARCHIVE_ENABLED, DATABASE_PATH, INCREMENTAL_SCRAPING, LOG_FILE, LOG_LEVEL,
+    REPLAY_DATABASE_PATH
+)
 
 class JobScraper:
-    def __init__(self):
+    def __init__(self, db_path: str = DATABASE_PATH, record: bool = False,
+                 replay: bool = False, replay_at: str = None):
         self.setup_logging()
-        self.db = JobDatabase(DATABASE_PATH)
+        self.db = JobDatabase(db_path)
         self.email_notifier = EmailNotifier()
         self.config = self.load_config()
+        self.job_filter = JobFilter(self.config.get('filters'))
+        self.configure_rate_limits()
+        self.replay = replay
         
-        # Initialize scrapers
+        # Initialize scrapers. Snapshots are looked up by exact URL, so recorded and replayed
+        # runs both skip watermarks: their search URLs don't depend on the database's state
+        incremental = INCREMENTAL_SCRAPING and not (record or replay)
         self.scrapers = {
-            'linkedin': LinkedInScraper(),
-            'custom': CustomScraper()
+            'linkedin': LinkedInScraper(self.db, incremental=incremental),
+            'custom': CustomScraper(self.db, incremental=incremental)
         }
+        
+        # Record fetched pages, or serve them from the snapshot store without network access
+        if record or replay:
+            store = SnapshotStore()
+            for scraper in self.scrapers.values():
+                if replay:
+                    scraper.fetcher = AsyncFetcher(replay=store, replay_at=replay_at)
+                else:
+                    scraper.fetcher = AsyncFetcher(snapshots=store)
     
     def setup_logging(self):
         """Setup logging configuration"""
@@ -48,60 +74,62 @@ class JobScraper:
             self.logger.error(f"Error loading config: {e}")
             return {}
     
-    def run_scraping(self) -> List[Dict]:
-        """Run all scrapers and return new jobs"""
-        all_new_jobs = []
-        
+    def configure_rate_limits(self):
+        """Apply per-host rate limits from the YAML config to the shared limiter"""
+        limiter = get_rate_limiter()
+        for host, limit in (self.config.get('rate_limits') or {}).items():
+            limiter.configure(host, limit.get('rate'), limit.get('burst', 1))
+    
+    def run_scraping(self, notify: bool = False) -> List[Dict]:
+        """Stream every enabled source through the pipeline and return new jobs"""
         self.logger.info("🚀 Starting job scraping...")
         
-        # Scrape from major job sites
+        pipeline = JobPipeline(self.db, self.job_filter,
+                               notify=self.send_notifications if notify else None, logger=self.logger)
+        
+        # Major job sites
         for source, scraper in self.scrapers.items():
             if source == 'custom':
                 continue  # Handle custom URLs separately
-                
-            if not self.config.get('job_sources', {}).get(source, {}).get('enabled', True):
-                continue
             
-            try:
-                self.logger.info(f"Scraping {source}...")
-                search_params = self.config['job_sources'][source]['search_params']
-                jobs = scraper.scrape_jobs(search_params)
-                
-                # Filter and add new jobs
-                new_jobs = self._process_jobs(jobs, source)
-                all_new_jobs.extend(new_jobs)
-                
-                self.logger.info(f"Found {len(new_jobs)} new jobs from {source}")
-                
-            except Exception as e:
-                self.logger.error(f"Error scraping {source}: {e}")
+            source_config = self.config.get('job_sources', {}).get(source, {})
+            if not source_config.get('enabled', True):
+                continue
+            pipeline.add_source(source, partial(scraper.scrape_jobs, source_config.get('search_params', {})),
+                                commit=scraper.commit)
         
-        # Scrape custom URLs
+        # Custom URLs
         custom_urls = self.config.get('custom_urls', [])
         if custom_urls:
-            try:
-                self.logger.info("Scraping custom URLs...")
-                jobs = self.scrapers['custom'].scrape_jobs(custom_urls)
-                new_jobs = self._process_jobs(jobs, 'custom')
-                all_new_jobs.extend(new_jobs)
-                
-                self.logger.info(f"Found {len(new_jobs)} new jobs from custom URLs")
-                
-            except Exception as e:
-                self.logger.error(f"Error scraping custom URLs: {e}")
+            pipeline.add_source('custom URLs', partial(self.scrapers['custom'].scrape_jobs, custom_urls),
+                                commit=self.scrapers['custom'].commit)
         
-        return all_new_jobs
-    
-    def _process_jobs(self, jobs: List[Dict], source: str) -> List[Dict]:
-        """Process jobs and add new ones to database"""
-        new_jobs = []
+        all_new_jobs = pipeline.run()
         
-        for job in jobs:
-            if not self.db.job_exists(job['job_id']):
-                if self.db.add_job(job):
-                    new_jobs.append(job)
+        counts = pipeline.stats()
+        for source in sorted(counts['scraped']):
+            self.logger.info(
+                f"Found {counts['new'].get(source, 0)} new jobs from {source} "
+                f"({counts['scraped'][source]} scraped)"
+            )
+            if counts['duplicates'].get(source):
+                self.logger.info(f"Suppressed {counts['duplicates'][source]} near-duplicate postings from {source}")
         
-        return new_jobs
+        if self.job_filter:
+            stats = self.job_filter.stats()
+            rejections = ', '.join(f"{rule} {count}" for rule, count in stats['rejections'].items())
+            self.logger.info(
+                f"Filters: {stats['accepted']} jobs kept, {stats['rejected']} rejected"
+                + (f" ({rejections})" if rejections else "")
+            )
+        
+        stats = self.db.seen_index.stats()
+        self.logger.info(
+            f"Seen-ID index ({stats['kind']}): {stats['ids']} IDs in {stats['memory_bytes'] // 1024} KiB, "
+            f"{stats['hits']}/{stats['lookups']} lookups already seen ({stats['hit_rate']:.0%})"
+        )
+        
+        return all_new_jobs
     
     def send_notifications(self, new_jobs: List[Dict]):
         """Send email notifications for new jobs"""
@@ -129,23 +157,84 @@ class JobScraper:
         except Exception as e:
             self.logger.error(f"❌ Error updating README: {e}")
     
+    def archive_old_jobs(self):
+        """Move postings past the archive age out of the hot table"""
+        try:
+            moved = get_job_archive().archive_old_jobs(self.db, ARCHIVE_AFTER_DAYS)
+            if moved:
+                self.logger.info(f"🗄️  Archived {moved} jobs older than {ARCHIVE_AFTER_DAYS} days")
+        except Exception as e:
+            self.logger.error(f"❌ Error archiving old jobs: {e}")
+    
     def run(self):
         """Main execution method"""
         try:
-            # Run scraping
-            new_jobs = self.run_scraping()
+            # Run scraping; the pipeline sends the notification once every source is done
+            new_jobs = self.run_scraping(notify=not self.replay)
             
-            # Send notifications
-            self.send_notifications(new_jobs)
+            if self.replay:
+                self.logger.info(f"🔁 Replay completed! Found {len(new_jobs)} new jobs (notifications and README skipped)")
+                return
             
             # Update README with latest jobs
             self.update_readme()
             
+            # Keep the hot table to the current season
+            if ARCHIVE_ENABLED:
+                self.archive_old_jobs()
+            
             self.logger.info(f"✅ Scraping completed! Found {len(new_jobs)} new jobs")
             
         except Exception as e:
             self.logger.error(f"❌ Error in main execution: {e}")
 
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Scrape job postings and notify about new ones")
+    parser.add_argument('--record', action='store_true',
+                        help="store every fetched page in the snapshot store")
+    parser.add_argument('--replay', action='store_true',
+                        help="run the pipeline from stored snapshots without network access")
+    parser.add_argument('--replay-at', metavar='TIMESTAMP',
+                        help="replay the newest snapshots taken at or before this ISO timestamp")
+    parser.add_argument('--db',
+                        help=f"database to write to (default: {DATABASE_PATH}, "
+                             f"or {REPLAY_DATABASE_PATH} when replaying)")
+    parser.add_argument('--rebuild-search-index', action='store_true',
+                        help="rebuild the full-text search index from the jobs table and exit")
+    parser.add_argument('--check-stats', action='store_true',
+                        help="compare the dashboard stats rollup with a full recount and exit")
+    parser.add_argument('--rebuild-stats', action='store_true',
+                        help="recompute the dashboard stats rollup from the jobs table and exit")
+    args = parser.parse_args()
+    
+    # Replayed jobs must not land in the live database, where they would count as seen
+    args.replay = args.replay or bool(args.replay_at)
+    if args.db is None:
+        args.db = REPLAY_DATABASE_PATH if args.replay else DATABASE_PATH
+    return args
+
 if __name__ == "__main__":
-    scraper = JobScraper()
+    args = parse_args()
+    if args.rebuild_search_index:
+        JobDatabase(args.db).rebuild_search_index()
+        print(f"Rebuilt the search index of {args.db}")
+        sys.exit(0)
+    
+    if args.check_stats:
+        mismatches = JobDatabase(args.db).check_stats()
+        for row in mismatches:
+            print(f"{row['scope']}/{row['key']}: stored {row['stored_total']} total, {row['stored_new']} new; "
+                  f"expected {row['expected_total']} total, {row['expected_new']} new")
+        print("Stats rollup is consistent" if not mismatches
+              else f"{len(mismatches)} rollup rows out of date, run with --rebuild-stats")
+        sys.exit(1 if mismatches else 0)
+    
+    if args.rebuild_stats:
+        JobDatabase(args.db).rebuild_stats()
+        print(f"Rebuilt the stats rollup of {args.db}")
+        sys.exit(0)
+    
+    scraper = JobScraper(db_path=args.db, record=args.record,
+                         replay=args.replay, replay_at=args.replay_at)
     scraper.run() 
\ No newline at end of file
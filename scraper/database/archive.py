@@ -0,0 +1,165 @@
+import argparse
+import json
+import sys
+import threading
+from typing import Dict, Iterator, List, Optional
+
+from config.settings import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, ARCHIVE_PATH
+from scraper.database.connection import get_connection_manager
+from scraper.database.migrations import migrate
+from scraper.database.search import search_jobs
+
+ARCHIVE_SCHEMA = 'archive'
+
+class JobArchive:
+    """Cold storage for postings that have aged out of the hot jobs table.
+
+    The archive is a second SQLite database with the same schema (it runs the
+    same migrations), so it has its own search index and stats rollup. Batches
+    move through the hot writer with the archive attached, in two transactions:
+    rows are copied over and committed first, then each row the archive now
+    holds leaves an ID stub in ``archived_ids`` (so dedupe still recognizes
+    the posting) and is deleted from the hot table. A crash in between leaves
+    rows in both databases, never in neither. Archived postings are only read
+    on demand, through ``search`` and ``iter_jobs``.
+    """
+
+    def __init__(self, path: str = ARCHIVE_PATH):
+        self.path = path
+        self.connections = get_connection_manager(path)
+        migrate(self.connections)
+
+    def archive_old_jobs(self, db, older_than_days: int = ARCHIVE_AFTER_DAYS,
+                         batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+        """Move jobs scraped more than older_than_days ago out of db; returns how many moved"""
+        hot = db.connections
+        hot.attach(self.path, ARCHIVE_SCHEMA)
+
+        conn = hot.writer_connection()
+        cutoff = conn.execute("SELECT datetime('now', ?)", (f'-{int(older_than_days)} days',)).fetchone()[0]
+        # Stored columns only: generated columns are recomputed on the archive side
+        columns = ', '.join(
+            row['name'] for row in conn.execute('PRAGMA main.table_xinfo(jobs)') if row['hidden'] == 0
+        )
+
+        moved = 0
+        last = ('', 0)
+        while True:
+            # The copy commits on its own: with WAL, a transaction that writes both
+            # files can survive a crash in one and not the other
+            with hot.writer() as conn:
+                conn.execute('DROP TABLE IF EXISTS temp.archive_batch')
+                conn.execute('''
+                    CREATE TEMP TABLE archive_batch AS
+                    SELECT id, scraped_date FROM main.jobs
+                    WHERE scraped_date < ? AND (scraped_date, id) > (?, ?)
+                    ORDER BY scraped_date, id LIMIT ?
+                ''', (cutoff, *last, batch_size))
+                count = conn.execute('SELECT COUNT(*) FROM temp.archive_batch').fetchone()[0]
+                if count:
+                    conn.execute(f'''
+                        INSERT OR IGNORE INTO {ARCHIVE_SCHEMA}.jobs ({columns})
+                        SELECT {columns} FROM main.jobs WHERE id IN (SELECT id FROM temp.archive_batch)
+                    ''')
+                    last = tuple(conn.execute(
+                        'SELECT scraped_date, id FROM temp.archive_batch ORDER BY scraped_date DESC, id DESC LIMIT 1'
+                    ).fetchone())
+
+            # Then only rows the archive is known to hold leave the hot table
+            with hot.writer() as conn:
+                if count:
+                    conn.execute('DROP TABLE IF EXISTS temp.archive_moved')
+                    conn.execute(f'''
+                        CREATE TEMP TABLE archive_moved AS
+                        SELECT id, job_id FROM main.jobs AS hot
+                        WHERE id IN (SELECT id FROM temp.archive_batch) AND EXISTS (
+                            SELECT 1 FROM {ARCHIVE_SCHEMA}.jobs AS cold
+                            WHERE cold.job_id = hot.job_id OR (hot.job_id IS NULL AND cold.id = hot.id)
+                        )
+                    ''')
+                    conn.execute('''
+                        INSERT OR IGNORE INTO main.archived_ids (job_id)
+                        SELECT job_id FROM temp.archive_moved WHERE job_id IS NOT NULL
+                    ''')
+                    conn.execute('DELETE FROM main.jobs WHERE id IN (SELECT id FROM temp.archive_moved)')
+                    moved += conn.execute('SELECT COUNT(*) FROM temp.archive_moved').fetchone()[0]
+                    conn.execute('DROP TABLE temp.archive_moved')
+                conn.execute('DROP TABLE temp.archive_batch')
+            if count < batch_size:
+                break
+        return moved
+
+    def search(self, text: str, limit: int = 20, cursor: Optional[str] = None) -> Dict:
+        """Full-text search over archived jobs (same results shape as search.search_jobs)"""
+        return search_jobs(self.connections.reader(), text, limit, cursor)
+
+    def iter_jobs(self, since: Optional[str] = None, until: Optional[str] = None) -> Iterator[Dict]:
+        """Stream archived jobs in scrape order, optionally limited to a scraped_date range"""
+        conditions, params = [], []
+        if since:
+            conditions.append('scraped_date >= ?')
+            params.append(since)
+        if until:
+            conditions.append('scraped_date < ?')
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        cursor = self.connections.reader().execute(
+            f'SELECT * FROM jobs {where} ORDER BY scraped_date, id', params
+        )
+        for row in cursor:
+            yield dict(row)
+
+    def count(self) -> int:
+        return self.connections.reader().execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+
+_archives: Dict[str, JobArchive] = {}
+_archives_lock = threading.Lock()
+
+def get_job_archive(path: str = ARCHIVE_PATH) -> JobArchive:
+    """Get the process-wide archive for a database file (migrated once, on first use)"""
+    with _archives_lock:
+        if path not in _archives:
+            _archives[path] = JobArchive(path)
+        return _archives[path]
+
+def main(argv: List[str] = None) -> int:
+    """Command line entry point: python -m scraper.database.archive"""
+    from config.settings import DATABASE_PATH
+    from scraper.database.models import JobDatabase
+
+    parser = argparse.ArgumentParser(description="Move old postings to the archive and query it")
+    parser.add_argument('--db', default=DATABASE_PATH,
+                        help=f"hot database (default: {DATABASE_PATH})")
+    parser.add_argument('--archive', default=ARCHIVE_PATH,
+                        help=f"archive database (default: {ARCHIVE_PATH})")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help="archive jobs older than the cutoff")
+    run.add_argument('--days', type=int, default=ARCHIVE_AFTER_DAYS,
+                     help=f"archive jobs scraped more than this many days ago (default: {ARCHIVE_AFTER_DAYS})")
+    search = commands.add_parser('search', help="full-text search the archive")
+    search.add_argument('text')
+    search.add_argument('--limit', type=int, default=20)
+    export = commands.add_parser('export', help="write archived jobs as JSON lines to stdout")
+    export.add_argument('--since', help="only jobs scraped on or after this date (YYYY-MM-DD)")
+    export.add_argument('--until', help="only jobs scraped before this date (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    archive = JobArchive(args.archive)
+
+    if args.command == 'run':
+        moved = archive.archive_old_jobs(JobDatabase(args.db), args.days)
+        print(f"Archived {moved} jobs ({archive.count()} in archive)")
+        return 0
+
+    if args.command == 'search':
+        for job in archive.search(args.text, args.limit)['jobs']:
+            print(f"{job['created_at'][:10]}  {job['title']} @ {job['company']} - {job['url']}")
+        return 0
+
+    for job in archive.iter_jobs(args.since, args.until):
+        print(json.dumps(job, ensure_ascii=False))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
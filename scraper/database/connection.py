@@ -0,0 +1,120 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator
+
+from config.settings import (
+    DB_BUSY_TIMEOUT_MS, DB_CACHE_SIZE_KB, DB_MMAP_SIZE, DB_STATEMENT_CACHE_SIZE, DB_SYNCHRONOUS
+)
+
+class ConnectionManager:
+    """Persistent, tuned SQLite connections for one database file.
+
+    The database runs in WAL mode so readers never block on the writer (and
+    the writer never waits for readers). Every thread gets its own long-lived
+    read-only connection, while all writes go through a single shared writer
+    connection, serialized by a lock and wrapped in ``BEGIN IMMEDIATE``
+    transactions. Connections keep SQLite's prepared-statement cache warm
+    across calls instead of reconnecting for every query.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._writer = None
+        self._writer_lock = threading.RLock()
+        self._writer_depth = 0
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with the tuned pragmas applied"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=DB_BUSY_TIMEOUT_MS / 1000,
+            isolation_level=None,  # transactions are managed explicitly
+            check_same_thread=False,
+            cached_statements=DB_STATEMENT_CACHE_SIZE
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f'PRAGMA busy_timeout = {int(DB_BUSY_TIMEOUT_MS)}')
+        conn.execute(f'PRAGMA synchronous = {DB_SYNCHRONOUS}')
+        conn.execute(f'PRAGMA cache_size = -{int(DB_CACHE_SIZE_KB)}')
+        conn.execute(f'PRAGMA mmap_size = {int(DB_MMAP_SIZE)}')
+        conn.execute('PRAGMA temp_store = MEMORY')
+        return conn
+
+    def reader(self) -> sqlite3.Connection:
+        """Get this thread's read-only connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.writer_connection()  # make sure WAL mode is on before the first read
+            conn = self._connect()
+            conn.execute('PRAGMA query_only = ON')
+            self._local.conn = conn
+        return conn
+
+    def writer_connection(self) -> sqlite3.Connection:
+        """Get the shared writer connection (use ``writer()`` to write)"""
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = self._connect()
+                self._writer.execute('PRAGMA journal_mode = WAL')
+            return self._writer
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Run a write transaction on the single writer connection.
+
+        Nested uses join the outer transaction; it commits when the outermost
+        block exits and rolls back if an exception escapes.
+        """
+        with self._writer_lock:
+            conn = self.writer_connection()
+            outermost = self._writer_depth == 0
+            if outermost:
+                conn.execute('BEGIN IMMEDIATE')
+            self._writer_depth += 1
+            try:
+                yield conn
+            except BaseException:
+                self._writer_depth -= 1
+                if outermost:
+                    conn.execute('ROLLBACK')
+                raise
+            else:
+                self._writer_depth -= 1
+                if outermost:
+                    conn.execute('COMMIT')
+
+    def attach(self, path: str, schema: str):
+        """Attach another database file to the writer connection under a schema name"""
+        with self._writer_lock:
+            conn = self.writer_connection()
+            attached = {row[1] for row in conn.execute('PRAGMA database_list')}
+            if schema not in attached:
+                conn.execute('ATTACH DATABASE ? AS ' + schema, (path,))
+
+    def close(self):
+        """Close the writer and this thread's reader"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+_managers: Dict[str, ConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+def get_connection_manager(db_path: str) -> ConnectionManager:
+    """Get the process-wide connection manager for a database file"""
+    key = os.path.abspath(db_path)
+    with _managers_lock:
+        if key not in _managers:
+            _managers[key] = ConnectionManager(db_path)
+        return _managers[key]
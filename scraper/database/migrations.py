@@ -0,0 +1,469 @@
+import argparse
+import hashlib
+import sys
+from typing import Callable, Dict, List, Tuple
+
+from scraper.database.near_duplicates import init_near_duplicates
+from scraper.database.pagination import encode_cursor, jobs_page_query
+from scraper.database.search import CANDIDATES_SQL, SEARCH_WEIGHTS
+from scraper.database.stats import init_stats
+from scraper.parsing.locations import parse_location
+from scraper.parsing.urls import canonicalize_url, job_identity
+
+# Jobs in Canada or open to remote work; idx_canada_recent is built on this exact condition
+CANADA_OR_REMOTE = "(country = 'CA' OR is_remote = 1)"
+# The same, less near-duplicates; idx_canada_recent has been built on this since migration 14
+CANADA_OR_REMOTE_CANONICAL = f"{CANADA_OR_REMOTE} AND duplicate_of IS NULL"
+
+def _columns(conn, table: str) -> set:
+    # table_xinfo also lists generated columns
+    return {row[1] for row in conn.execute(f'PRAGMA table_xinfo({table})')}
+
+def create_base_tables(conn):
+    """Jobs, query planner stats and selector profiles"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id TEXT UNIQUE,
+            title TEXT NOT NULL,
+            company TEXT NOT NULL,
+            location TEXT,
+            salary_min REAL,
+            salary_max REAL,
+            description TEXT,
+            url TEXT NOT NULL,
+            source TEXT NOT NULL,
+            posted_date TEXT,
+            scraped_date TEXT DEFAULT CURRENT_TIMESTAMP,
+            is_new BOOLEAN DEFAULT 1,
+            applied BOOLEAN DEFAULT 0,
+            metadata TEXT
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_source ON jobs(source)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_posted_date ON jobs(posted_date)')
+
+    # Per-query yield statistics for the LinkedIn query planner
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS query_stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            query_key TEXT NOT NULL,
+            run_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            skipped BOOLEAN DEFAULT 0,
+            pages INTEGER DEFAULT 0,
+            fetched INTEGER DEFAULT 0,
+            marginal INTEGER DEFAULT 0,
+            new INTEGER DEFAULT 0
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_query_stats_key ON query_stats(query_key, id)')
+
+    # Learned selectors for custom URLs
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS selector_profiles (
+            source TEXT PRIMARY KEY,
+            profile TEXT NOT NULL,
+            updated_date TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+def add_geography(conn):
+    """Normalized location columns, their indexes, and a backfill of existing rows"""
+    existing = _columns(conn, 'jobs')
+    for column, column_type in (('country', 'TEXT'), ('province_code', 'TEXT'),
+                                ('city', 'TEXT'), ('is_remote', 'BOOLEAN')):
+        if column not in existing:
+            conn.execute(f'ALTER TABLE jobs ADD COLUMN {column} {column_type}')
+
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_geography ON jobs(country, province_code, city)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_is_remote ON jobs(is_remote)')
+
+    # is_remote is always 0 or 1 once a row has been parsed
+    rows = conn.execute('SELECT id, location FROM jobs WHERE is_remote IS NULL').fetchall()
+    conn.executemany('''
+        UPDATE jobs
+        SET country = :country, province_code = :province_code,
+            city = :city, is_remote = :is_remote
+        WHERE id = :id
+    ''', [dict(parse_location(location), id=job_id) for job_id, location in rows])
+
+def add_search_index(conn):
+    """FTS5 index over jobs and the triggers that keep it in sync"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'"
+    ).fetchone()
+
+    # External-content table: the text lives in jobs, the index only holds tokens
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+            title, company, location, description,
+            content='jobs', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+            INSERT INTO jobs_fts (rowid, title, company, location, description)
+            VALUES (new.id, new.title, new.company, new.location, new.description);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+            INSERT INTO jobs_fts (jobs_fts, rowid, title, company, location, description)
+            VALUES ('delete', old.id, old.title, old.company, old.location, old.description);
+        END
+    ''')
+    # Only re-index when searchable text changes, not on is_new/applied updates
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_update
+        AFTER UPDATE OF title, company, location, description ON jobs BEGIN
+            INSERT INTO jobs_fts (jobs_fts, rowid, title, company, location, description)
+            VALUES ('delete', old.id, old.title, old.company, old.location, old.description);
+            INSERT INTO jobs_fts (rowid, title, company, location, description)
+            VALUES (new.id, new.title, new.company, new.location, new.description);
+        END
+    ''')
+
+    if not exists:
+        # Persist the column weights so ORDER BY rank uses them
+        weights = ', '.join(str(w) for w in SEARCH_WEIGHTS)
+        conn.execute("INSERT INTO jobs_fts (jobs_fts, rank) VALUES ('rank', ?)", (f'bm25({weights})',))
+        # Index whatever the database already holds
+        conn.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')")
+
+def add_keyset_indexes(conn):
+    """(scraped_date, id) indexes for newest-first keyset pagination"""
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_scraped_recent ON jobs(scraped_date, id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_new_recent ON jobs(scraped_date, id) WHERE is_new = 1')
+    # The partial index serves is_new = 1 lookups too; the planner would otherwise
+    # pick idx_is_new and then sort every new job
+    conn.execute('DROP INDEX IF EXISTS idx_is_new')
+
+def add_stats_rollup(conn):
+    """Trigger-maintained job_stats rollup for the dashboards"""
+    init_stats(conn)
+
+def tune_indexes(conn):
+    """Covering index for the README's Canadian listing, drop the redundant job_id index"""
+    # UNIQUE(job_id) already has sqlite_autoindex_jobs_1; a second index only slows inserts
+    conn.execute('DROP INDEX IF EXISTS idx_job_id')
+    # Newest Canadian/remote jobs straight from the index, no table lookups or sort.
+    # The planner prefers a multi-index OR plus sort here, so readers name it with INDEXED BY.
+    conn.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_canada_recent
+        ON jobs(scraped_date, title, company, location, url, country, is_remote)
+        WHERE {CANADA_OR_REMOTE}
+    ''')
+
+def add_archived_ids(conn):
+    """ID stubs of postings moved to the archive, so dedupe still sees them"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS archived_ids (
+            job_id TEXT PRIMARY KEY,
+            archived_at TEXT DEFAULT CURRENT_TIMESTAMP
+        ) WITHOUT ROWID
+    ''')
+
+# Metadata fields exposed as generated columns: (column, JSON path)
+METADATA_COLUMNS = (
+    ('keyword', '$.keyword'),
+    ('source_url', '$.source_url'),
+)
+
+def add_metadata_columns(conn):
+    """Indexed generated columns over the metadata JSON, for keyword/source yield queries"""
+    existing = _columns(conn, 'jobs')
+    for column, path in METADATA_COLUMNS:
+        if column not in existing:
+            # json_valid guards rows written before metadata was always JSON
+            conn.execute(f'''
+                ALTER TABLE jobs ADD COLUMN {column} TEXT GENERATED ALWAYS AS (
+                    CASE WHEN json_valid(metadata) THEN json_extract(metadata, '{path}') END
+                ) VIRTUAL
+            ''')
+    # Which keyword produced a job, newest first
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_keyword ON jobs(keyword, scraped_date)')
+    # Yield rollup: grouped in index order, with the date filter checked before any row lookup
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_source_yield
+        ON jobs(source, keyword, source_url, scraped_date, is_new)
+    ''')
+    conn.execute('DROP INDEX IF EXISTS idx_source')  # a prefix of idx_source_yield
+
+def add_near_duplicates(conn):
+    """MinHash signatures, the LSH index, and duplicate_of clusters (see near_duplicates)"""
+    init_near_duplicates(conn)
+
+def canonicalize_job_ids(conn):
+    """Move jobs to canonical URLs and stable job IDs, collapsing rows that were the same job"""
+    survivors = {}  # new job_id -> id of the row that keeps it (the first one stored)
+    losers, updates = [], []
+    for row_id, job_id, title, company, url in conn.execute(
+            'SELECT id, job_id, title, company, url FROM jobs ORDER BY id').fetchall():
+        # Only IDs the old title_company_url scheme produced can be recomputed; others are kept
+        if job_id == hashlib.md5(f"{title}_{company}_{url}".encode()).hexdigest():
+            new_id, new_url = job_identity(title, company, url), canonicalize_url(url)
+        else:
+            new_id, new_url = job_id, url
+
+        if new_id in survivors:
+            losers.append((survivors[new_id], row_id))
+        else:
+            survivors[new_id] = row_id
+            if (new_id, new_url) != (job_id, url):
+                updates.append((new_id, new_url, row_id))
+
+    for survivor, loser in losers:
+        # Keep what the user did with any copy: applied to one means applied, seen one means seen.
+        # Copies flagged as near-duplicates had is_new cleared by that migration, not by the user.
+        conn.execute('''
+            UPDATE jobs SET
+                applied = MAX(applied, (SELECT applied FROM jobs WHERE id = :loser)),
+                is_new = MIN(is_new, COALESCE(
+                    (SELECT is_new FROM jobs WHERE id = :loser AND duplicate_of IS NULL), is_new
+                ))
+            WHERE id = :survivor
+        ''', {'survivor': survivor, 'loser': loser})
+        conn.execute('UPDATE jobs SET duplicate_of = ? WHERE duplicate_of = ?', (survivor, loser))
+    conn.execute('UPDATE jobs SET duplicate_of = NULL WHERE duplicate_of = id')
+    conn.executemany('DELETE FROM jobs WHERE id = ?', [(loser,) for _, loser in losers])
+    conn.executemany('UPDATE jobs SET job_id = ?, url = ? WHERE id = ?', updates)
+
+def add_source_state(conn):
+    """Per source and query watermarks for incremental scraping"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS source_state (
+            source TEXT NOT NULL,
+            query_key TEXT NOT NULL,
+            newest_posted_date TEXT,
+            newest_job_id TEXT,
+            fingerprint TEXT,
+            last_success_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (source, query_key)
+        ) WITHOUT ROWID
+    ''')
+
+def add_search_vocabulary(conn):
+    """Read-only view of the words in the search index, for expanding prefixes"""
+    conn.execute('CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts_vocab USING fts5vocab(jobs_fts, row)')
+
+def add_filtered_keyset_indexes(conn):
+    """Keyset indexes for the dashboard's country, province and remote filters"""
+    # Each ends in (scraped_date, id), so a filtered page is one index walk with no sort.
+    # Partial on duplicate_of IS NULL, since pages only show canonical postings.
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_country_recent
+        ON jobs(country, scraped_date, id) WHERE duplicate_of IS NULL
+    ''')
+    # Leads with province_code so a province filter works with or without a country
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_province_recent
+        ON jobs(province_code, scraped_date, id) WHERE duplicate_of IS NULL
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_remote_recent
+        ON jobs(is_remote, scraped_date, id) WHERE duplicate_of IS NULL
+    ''')
+
+def canonical_readme_index(conn):
+    """Rebuild the README's covering index without near-duplicate postings"""
+    # duplicate_of is in the key only so the planner can check the filter without the table
+    conn.execute('DROP INDEX IF EXISTS idx_canada_recent')
+    conn.execute(f'''
+        CREATE INDEX idx_canada_recent
+        ON jobs(scraped_date, title, company, location, url, country, is_remote, duplicate_of)
+        WHERE {CANADA_OR_REMOTE_CANONICAL}
+    ''')
+
+# Ordered schema migrations: (version, name, step). Steps are idempotent, so a
+# database created before versioning is brought up to date by running them all.
+# Append new steps; never renumber or edit ones that have shipped.
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, 'create base tables', create_base_tables),
+    (2, 'add geography columns', add_geography),
+    (3, 'add full-text search index', add_search_index),
+    (4, 'add keyset pagination indexes', add_keyset_indexes),
+    (5, 'add stats rollup', add_stats_rollup),
+    (6, 'tune indexes for hot queries', tune_indexes),
+    (7, 'add archived job ID stubs', add_archived_ids),
+    (8, 'add indexed metadata columns', add_metadata_columns),
+    (9, 'add near-duplicate detection', add_near_duplicates),
+    (10, 'canonicalize job URLs and IDs', canonicalize_job_ids),
+    (11, 'add source watermarks', add_source_state),
+    (12, 'add search vocabulary', add_search_vocabulary),
+    (13, 'add filtered keyset indexes', add_filtered_keyset_indexes),
+    (14, 'drop near-duplicates from the README index', canonical_readme_index),
+]
+
+# Dashboard job pages and the index each filter must walk: (name, filters, index).
+# Their SQL comes from jobs_page_query, as in the apps; each is checked for its
+# first page and for a page after a cursor.
+JOB_PAGES = [
+    ('jobs page', {}, 'idx_scraped_recent'),
+    ('new jobs page', {'filter_new': True}, 'idx_new_recent'),
+    ('jobs page in a country', {'country': 'CA'}, 'idx_country_recent'),
+    ('jobs page in a province', {'country': 'CA', 'province': 'ON'}, 'idx_province_recent'),
+    ('jobs page in a province, any country', {'province': 'ON'}, 'idx_province_recent'),
+    ('remote jobs page', {'remote_only': True}, 'idx_remote_recent'),
+    ('new remote jobs page', {'filter_new': True, 'remote_only': True}, 'idx_remote_recent'),
+]
+
+def _job_page_queries() -> List[Tuple]:
+    queries = []
+    for name, filters, index in JOB_PAGES:
+        for suffix, cursor in (('', None), (', later page', encode_cursor(['9999', 0]))):
+            sql, params = jobs_page_query('*', 20, cursor, **filters)
+            queries.append((name + suffix, sql, tuple(params), index))
+    return queries
+
+# Hot queries and the index each one must use: (name, SQL, parameters, index)
+HOT_QUERIES = [
+    ('job lookup by ID', 'SELECT 1 FROM jobs WHERE job_id = ?',
+     ('x',), 'sqlite_autoindex_jobs_1'),
+    ('unprocessed jobs', 'SELECT * FROM jobs WHERE is_new = 1 ORDER BY scraped_date DESC',
+     (), 'idx_new_recent'),
+    ('README latest Canadian jobs',
+     'SELECT scraped_date, title, company, location, url FROM jobs INDEXED BY idx_canada_recent '
+     f'WHERE {CANADA_OR_REMOTE_CANONICAL} '
+     'ORDER BY scraped_date DESC LIMIT ?',
+     (15,), 'COVERING INDEX idx_canada_recent'),
+    ('latest scrape', 'SELECT MAX(scraped_date) FROM jobs', (), 'idx_scraped_recent'),
+    ('jobs in a province', 'SELECT id FROM jobs WHERE country = ? AND province_code = ?',
+     ('CA', 'ON'), 'idx_geography'),
+    ('archived job lookup by ID', 'SELECT 1 FROM archived_ids WHERE job_id = ?',
+     ('x',), 'PRIMARY KEY'),
+    ('archival candidates',
+     'SELECT id, scraped_date FROM main.jobs WHERE scraped_date < ? AND (scraped_date, id) > (?, ?) '
+     'ORDER BY scraped_date, id LIMIT ?',
+     ('2000', '', 0, 500), 'idx_scraped_recent'),
+    ('jobs from a keyword', 'SELECT id FROM jobs WHERE keyword = ? ORDER BY scraped_date DESC',
+     ('python',), 'idx_keyword'),
+    ('keyword yield',
+     'SELECT source, keyword, source_url, COUNT(*), SUM(is_new IS 1) FROM jobs '
+     'WHERE scraped_date >= ? GROUP BY source, keyword, source_url',
+     ('2000',), 'idx_source_yield'),
+    ('near-duplicate candidates',
+     'WITH probe(band, bucket) AS (VALUES (?, ?)) SELECT lsh_buckets.id FROM probe '
+     'JOIN lsh_buckets ON lsh_buckets.band = probe.band AND lsh_buckets.bucket = probe.bucket',
+     (0, 0), 'PRIMARY KEY'),
+    ('duplicates of a job', 'SELECT id FROM jobs WHERE duplicate_of = ?', (1,), 'idx_duplicate_of'),
+    ('dashboard stats', 'SELECT total_count FROM job_stats WHERE scope = ? AND key = ?',
+     ('all', ''), 'PRIMARY KEY'),
+    # FTS5 index 192 walks the doclists in descending rowid order and stops at the LIMIT;
+    # fts5vocab index 6 is a range on term
+    ('search candidates', CANDIDATES_SQL, ('"intern"', 1000), 'VIRTUAL TABLE INDEX 192:'),
+    ('search prefix expansion', 'SELECT term FROM jobs_fts_vocab WHERE term >= ? AND term < ? LIMIT ?',
+     ('intern', 'intero', 17), 'VIRTUAL TABLE INDEX 6:'),
+    ('query planner history',
+     'SELECT * FROM query_stats WHERE query_key = ? ORDER BY id DESC', ('x',), 'idx_query_stats_key'),
+] + _job_page_queries()
+
+def ensure_version_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+def applied_versions(conn) -> Dict[int, str]:
+    """Applied migrations and when they ran"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    ).fetchone()
+    if not exists:
+        return {}
+    return {version: applied_at for version, applied_at
+            in conn.execute('SELECT version, applied_at FROM schema_version')}
+
+def current_version(conn) -> int:
+    return max(applied_versions(conn), default=0)
+
+def migrate(connections, target: int = None) -> List[int]:
+    """Apply pending migrations, each in its own transaction; returns the versions applied.
+
+    Runs ANALYZE and PRAGMA optimize afterwards so the planner has fresh
+    statistics for the new indexes.
+    """
+    applied = []
+    for version, name, step in MIGRATIONS:
+        if target is not None and version > target:
+            break
+        with connections.writer() as conn:
+            ensure_version_table(conn)
+            # Re-checked under the write lock: another process may have just migrated
+            if conn.execute('SELECT 1 FROM schema_version WHERE version = ?', (version,)).fetchone():
+                continue
+            step(conn)
+            conn.execute('INSERT INTO schema_version (version, name) VALUES (?, ?)', (version, name))
+        applied.append(version)
+
+    if applied:
+        with connections.writer() as conn:
+            conn.execute('ANALYZE')
+        connections.writer_connection().execute('PRAGMA optimize')
+    return applied
+
+def explain(conn, sql: str, params: Tuple = ()) -> List[str]:
+    """The query plan of a statement, one line per step"""
+    return [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+
+def check_query_plans(conn) -> List[Dict]:
+    """Hot queries whose plan does not use their index, or scans/sorts the jobs table"""
+    problems = []
+    for name, sql, params, index in HOT_QUERIES:
+        plan = explain(conn, sql, params)
+        text = ' | '.join(plan)
+        if index not in text or any(step.startswith('SCAN jobs') and index not in step for step in plan) \
+                or 'TEMP B-TREE' in text:
+            problems.append({'query': name, 'expected': index, 'plan': plan})
+    return problems
+
+def main(argv: List[str] = None) -> int:
+    """Command line entry point: python -m scraper.database.migrations"""
+    from config.settings import DATABASE_PATH
+    from scraper.database.connection import get_connection_manager
+
+    parser = argparse.ArgumentParser(description="Manage the job database schema")
+    parser.add_argument('--db', default=DATABASE_PATH,
+                        help=f"database to manage (default: {DATABASE_PATH})")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('status', help="show applied and pending migrations")
+    upgrade = commands.add_parser('migrate', help="apply pending migrations")
+    upgrade.add_argument('--to', type=int, metavar='VERSION', help="stop after this version")
+    commands.add_parser('plans', help="check that hot queries use their indexes")
+    commands.add_parser('optimize', help="refresh planner statistics (ANALYZE, PRAGMA optimize)")
+    args = parser.parse_args(argv)
+
+    connections = get_connection_manager(args.db)
+
+    if args.command == 'status':
+        applied = applied_versions(connections.reader())
+        for version, name, _ in MIGRATIONS:
+            state = f"applied {applied[version]}" if version in applied else "pending"
+            print(f"{version:>3}  {name:<35} {state}")
+        return 0
+
+    if args.command == 'migrate':
+        versions = migrate(connections, args.to)
+        print(f"Applied migrations {versions}" if versions else "Schema is up to date")
+        return 0
+
+    if args.command == 'optimize':
+        with connections.writer() as conn:
+            conn.execute('ANALYZE')
+        connections.writer_connection().execute('PRAGMA optimize')
+        print("Planner statistics refreshed")
+        return 0
+
+    problems = check_query_plans(connections.reader())
+    for problem in problems:
+        print(f"❌ {problem['query']}: expected {problem['expected']}, got {' | '.join(problem['plan'])}")
+    if not problems:
+        print(f"✅ All {len(HOT_QUERIES)} hot queries use their indexes")
+    return 1 if problems else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
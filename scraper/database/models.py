@@ -1,95 +1,170 @@
 import sqlite3
 import json
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
+from scraper.database.connection import get_connection_manager
+from scraper.database.migrations import migrate
+from scraper.database.near_duplicates import index_jobs
+from scraper.database.search import search_jobs
+from scraper.database.seen_index import SeenIndex
+from scraper.database.stats import check_stats, read_keyword_yield, rebuild_stats
+from scraper.parsing.locations import parse_location
 
 class JobDatabase:
     def __init__(self, db_path: str):
         self.db_path = db_path
+        self.connections = get_connection_manager(db_path)
+        self._seen_index = None
         self.init_database()
     
     def init_database(self):
-        """Initialize the database with required tables"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Jobs table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS jobs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    job_id TEXT UNIQUE,
-                    title TEXT NOT NULL,
-                    company TEXT NOT NULL,
-                    location TEXT,
-                    salary_min REAL,
-                    salary_max REAL,
-                    description TEXT,
-                    url TEXT NOT NULL,
-                    source TEXT NOT NULL,
-                    posted_date TEXT,
-                    scraped_date TEXT DEFAULT CURRENT_TIMESTAMP,
-                    is_new BOOLEAN DEFAULT 1,
-                    applied BOOLEAN DEFAULT 0,
-                    metadata TEXT
-                )
-            ''')
-            
-            # Create indexes for better performance
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_job_id ON jobs(job_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_source ON jobs(source)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_posted_date ON jobs(posted_date)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_is_new ON jobs(is_new)')
-            
-            conn.commit()
+        """Bring the database schema up to date (see scraper.database.migrations)"""
+        migrate(self.connections)
+    
+    def rebuild_search_index(self):
+        """Rebuild the full-text index from the jobs table"""
+        with self.connections.writer() as conn:
+            conn.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')")
+            conn.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('optimize')")
+    
+    def rebuild_stats(self):
+        """Recompute the job_stats rollup from the jobs table"""
+        with self.connections.writer() as conn:
+            rebuild_stats(conn)
+    
+    def check_stats(self) -> List[Dict]:
+        """Rollup rows that disagree with a full recount (empty when consistent)"""
+        return check_stats(self.connections.reader())
+    
+    def get_keyword_yield(self, days: Optional[int] = None, source: Optional[str] = None) -> List[Dict]:
+        """Jobs found per source and keyword (see scraper.database.stats.read_keyword_yield)"""
+        return read_keyword_yield(self.connections.reader(), days, source)
+    
+    def search_jobs(self, text: str, limit: int = 20, cursor: Optional[str] = None) -> Dict:
+        """Full-text search over jobs (see scraper.database.search.search_jobs)"""
+        return search_jobs(self.connections.reader(), text, limit, cursor)
+    
+    # Columns written on ingest, in row order
+    JOB_COLUMNS = (
+        'job_id', 'title', 'company', 'location', 'salary_min', 'salary_max',
+        'description', 'url', 'source', 'posted_date', 'metadata',
+        'country', 'province_code', 'city', 'is_remote'
+    )
+    
+    def _job_row(self, job_data: Dict) -> tuple:
+        """Turn a job dict into a row of JOB_COLUMNS"""
+        geography = parse_location(job_data.get('location'))
+        return (
+            job_data.get('job_id'),
+            job_data.get('title'),
+            job_data.get('company'),
+            job_data.get('location'),
+            job_data.get('salary_min'),
+            job_data.get('salary_max'),
+            job_data.get('description'),
+            job_data.get('url'),
+            job_data.get('source'),
+            job_data.get('posted_date'),
+            json.dumps(job_data.get('metadata', {})),
+            geography['country'],
+            geography['province_code'],
+            geography['city'],
+            geography['is_remote']
+        )
     
     def add_job(self, job_data: Dict) -> bool:
         """Add a new job to the database"""
+        return len(self.add_jobs([job_data])) > 0
+    
+    def add_jobs(self, jobs: Iterable[Dict]) -> List[str]:
+        """Add many jobs in a single transaction, returning the job_ids that were new (none on error)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    INSERT OR IGNORE INTO jobs 
-                    (job_id, title, company, location, salary_min, salary_max, 
-                     description, url, source, posted_date, metadata)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    job_data.get('job_id'),
-                    job_data.get('title'),
-                    job_data.get('company'),
-                    job_data.get('location'),
-                    job_data.get('salary_min'),
-                    job_data.get('salary_max'),
-                    job_data.get('description'),
-                    job_data.get('url'),
-                    job_data.get('source'),
-                    job_data.get('posted_date'),
-                    json.dumps(job_data.get('metadata', {}))
-                ))
-                
-                conn.commit()
-                return cursor.rowcount > 0
+            return self.store_jobs(jobs)
         except Exception as e:
-            print(f"Error adding job: {e}")
-            return False
+            print(f"Error adding jobs: {e}")
+            return []
+    
+    def store_jobs(self, jobs: Iterable[Dict]) -> List[str]:
+        """Add many jobs in a single transaction, returning the job_ids that were new.
+
+        New jobs that are near-duplicates of a stored posting are stored too, but
+        linked to it: ``duplicate_of`` is set on the row and on the job dict.
+        Unlike add_jobs, errors are raised, so callers know the batch was not stored.
+        """
+        jobs = list(jobs)
+        rows = [self._job_row(job) for job in jobs]
+        if not rows:
+            return []
+        
+        columns = ', '.join(self.JOB_COLUMNS)
+        placeholders = ', '.join('?' for _ in self.JOB_COLUMNS)
+        
+        with self.connections.writer() as conn:
+            if sqlite3.sqlite_version_info >= (3, 35, 0):
+                # Stage the batch, then insert it with one statement that reports what was new
+                conn.execute(f'CREATE TEMP TABLE IF NOT EXISTS staged_jobs ({columns})')
+                conn.execute('DELETE FROM staged_jobs')
+                conn.executemany(f'INSERT INTO staged_jobs ({columns}) VALUES ({placeholders})', rows)
+                
+                # NOT NULL filter matches what INSERT OR IGNORE used to skip silently
+                cursor = conn.execute(f'''
+                    INSERT INTO jobs ({columns})
+                    SELECT {columns} FROM staged_jobs
+                    WHERE title IS NOT NULL AND company IS NOT NULL
+                      AND url IS NOT NULL AND source IS NOT NULL
+                      AND NOT EXISTS (
+                          SELECT 1 FROM archived_ids WHERE archived_ids.job_id = staged_jobs.job_id
+                      )
+                    ORDER BY rowid
+                    ON CONFLICT(job_id) DO NOTHING
+                    RETURNING id, job_id
+                ''')
+                inserted = [(row[0], row[1]) for row in cursor.fetchall()]
+                conn.execute('DELETE FROM staged_jobs')
+            else:
+                # No RETURNING support: changes() per row, still one transaction
+                inserted = []
+                for row in rows:
+                    if conn.execute('SELECT 1 FROM archived_ids WHERE job_id = ?', (row[0],)).fetchone():
+                        continue
+                    cursor = conn.execute(
+                        f'INSERT OR IGNORE INTO jobs ({columns}) VALUES ({placeholders})', row
+                    )
+                    if cursor.rowcount > 0:
+                        inserted.append((cursor.lastrowid, row[0]))
+            
+            # Within a batch the first copy of a job_id wins, as with the insert
+            by_job_id = {}
+            for job in jobs:
+                by_job_id.setdefault(job.get('job_id'), job)
+            duplicates = index_jobs(conn, [(row_id, by_job_id[job_id]) for row_id, job_id in inserted])
+        
+        for row_id, job_id in inserted:
+            if row_id in duplicates:
+                by_job_id[job_id]['duplicate_of'] = duplicates[row_id]
+        
+        new_ids = [job_id for _, job_id in inserted]
+        
+        if self._seen_index is not None:
+            self._seen_index.update(new_ids)
+        return new_ids
     
     def get_new_jobs(self) -> List[Dict]:
         """Get all new jobs that haven't been processed"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT * FROM jobs 
-                WHERE is_new = 1 
-                ORDER BY scraped_date DESC
-            ''')
-            
-            return [dict(row) for row in cursor.fetchall()]
+        conn = self.connections.reader()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT * FROM jobs 
+            WHERE is_new = 1 
+            ORDER BY scraped_date DESC
+        ''')
+        
+        return [dict(row) for row in cursor.fetchall()]
     
     def mark_jobs_as_processed(self, job_ids: List[str]):
         """Mark jobs as processed (not new anymore)"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connections.writer() as conn:
             cursor = conn.cursor()
             
             placeholders = ','.join(['?' for _ in job_ids])
@@ -98,12 +173,87 @@ class JobDatabase:
                 SET is_new = 0 
                 WHERE job_id IN ({placeholders})
             ''', job_ids)
-            
-            conn.commit()
+    
+    @property
+    def seen_index(self) -> SeenIndex:
+        """In-memory index of stored (and archived) job IDs, loaded on first use and kept current by add_jobs"""
+        if self._seen_index is None:
+            conn = self.connections.reader()
+            count = conn.execute(
+                'SELECT (SELECT COUNT(*) FROM jobs) + (SELECT COUNT(*) FROM archived_ids)'
+            ).fetchone()[0]
+            cursor = conn.execute('SELECT job_id FROM jobs UNION ALL SELECT job_id FROM archived_ids')
+            self._seen_index = SeenIndex.from_ids((row[0] for row in cursor), count)
+        return self._seen_index
     
     def job_exists(self, job_id: str) -> bool:
-        """Check if a job already exists in the database"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT 1 FROM jobs WHERE job_id = ?', (job_id,))
-            return cursor.fetchone() is not None 
\ No newline at end of file
+        """Check if a job already exists in the database (or was archived)"""
+        conn = self.connections.reader()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT 1 FROM jobs WHERE job_id = ?
+            UNION ALL
+            SELECT 1 FROM archived_ids WHERE job_id = ?
+        ''', (job_id, job_id))
+        return cursor.fetchone() is not None
+    
+    def add_query_stats(self, stats: List[Dict]):
+        """Record one run's yield statistics for a set of search queries"""
+        with self.connections.writer() as conn:
+            conn.executemany('''
+                INSERT INTO query_stats (query_key, skipped, pages, fetched, marginal, new)
+                VALUES (:query_key, :skipped, :pages, :fetched, :marginal, :new)
+            ''', stats)
+    
+    def get_query_history(self, window: int) -> Dict[str, List[Dict]]:
+        """Get the most recent runs of every query, newest first"""
+        conn = self.connections.reader()
+        cursor = conn.execute('''
+            SELECT * FROM (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY query_key ORDER BY id DESC
+                ) AS run_rank
+                FROM query_stats
+            )
+            WHERE run_rank <= ?
+            ORDER BY query_key, id DESC
+        ''', (window,))
+        
+        history = {}
+        for row in cursor.fetchall():
+            history.setdefault(row['query_key'], []).append(dict(row))
+        return history
+    
+    def get_selector_profiles(self) -> Dict[str, Dict]:
+        """Get every learned selector profile, keyed by custom URL name"""
+        conn = self.connections.reader()
+        cursor = conn.execute('SELECT source, profile FROM selector_profiles')
+        return {source: json.loads(profile) for source, profile in cursor.fetchall()}
+    
+    def save_selector_profile(self, source: str, profile: Dict):
+        """Save (or replace) the learned selector profile for a custom URL"""
+        with self.connections.writer() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO selector_profiles (source, profile, updated_date)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+            ''', (source, json.dumps(profile)))
+    
+    def delete_selector_profile(self, source: str):
+        """Forget the learned selector profile for a custom URL"""
+        with self.connections.writer() as conn:
+            conn.execute('DELETE FROM selector_profiles WHERE source = ?', (source,))
+    
+    def get_source_state(self, source: str) -> Dict[str, Dict]:
+        """Get the watermarks of every query of a source, keyed by query"""
+        conn = self.connections.reader()
+        cursor = conn.execute('SELECT * FROM source_state WHERE source = ?', (source,))
+        return {row['query_key']: dict(row) for row in cursor.fetchall()}
+    
+    def save_source_state(self, states: List[Dict]):
+        """Save (or replace) the watermarks of queries that finished successfully"""
+        with self.connections.writer() as conn:
+            conn.executemany('''
+                INSERT OR REPLACE INTO source_state
+                    (source, query_key, newest_posted_date, newest_job_id, fingerprint, last_success_at)
+                VALUES (:source, :query_key, :newest_posted_date, :newest_job_id, :fingerprint, CURRENT_TIMESTAMP)
+            ''', states)
@@ -0,0 +1,161 @@
+import hashlib
+import random
+import re
+import struct
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import NEAR_DUPLICATE_BANDS, NEAR_DUPLICATE_PERMUTATIONS, NEAR_DUPLICATE_THRESHOLD
+from scraper.parsing.locations import parse_location
+
+SHINGLE_SIZE = 4  # characters per title shingle
+
+_PRIME = (1 << 61) - 1
+# Fixed seed: signatures are stored, so the permutations must never change between runs
+_rng = random.Random(20240601)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME))
+                 for _ in range(NEAR_DUPLICATE_PERMUTATIONS)]
+
+_NON_WORD = re.compile(r'[\W_]+')
+# Legal suffixes and noise that differ between boards listing the same employer
+_COMPANY_NOISE = {'inc', 'incorporated', 'ltd', 'limited', 'llc', 'llp', 'corp', 'corporation',
+                  'co', 'company', 'plc', 'the', 'group', 'canada'}
+
+def _words(text: Optional[str]) -> List[str]:
+    return _NON_WORD.sub(' ', (text or '').casefold()).split()
+
+def company_key(company: Optional[str]) -> str:
+    """Company name reduced to what every board agrees on ("Shopify Inc." -> "shopify")"""
+    words = [word for word in _words(company) if word not in _COMPANY_NOISE]
+    return ' '.join(words or _words(company))
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big')
+
+def minhash(title: Optional[str]) -> Tuple[int, ...]:
+    """MinHash signature of a title's character shingles"""
+    text = ' '.join(_words(title))
+    shingles = {_hash64(text[i:i + SHINGLE_SIZE].encode('utf-8'))
+                for i in range(max(1, len(text) - SHINGLE_SIZE + 1))}
+    return tuple(min((a * shingle + b) % _PRIME for shingle in shingles) for a, b in _PERMUTATIONS)
+
+def similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures"""
+    return sum(a == b for a, b in zip(first, second)) / len(first)
+
+def band_buckets(signature: Tuple[int, ...], company: str) -> List[int]:
+    """LSH bucket of each band; the company key is part of the bucket, so only
+    postings from the same employer ever become candidates"""
+    rows = len(signature) // NEAR_DUPLICATE_BANDS
+    buckets = []
+    for band in range(NEAR_DUPLICATE_BANDS):
+        data = company.encode('utf-8') + struct.pack(f'<{rows}Q', *signature[band * rows:(band + 1) * rows])
+        buckets.append(_hash64(data) - (1 << 63))  # fits SQLite's signed 64-bit integers
+    return buckets
+
+def _pack(signature: Tuple[int, ...]) -> bytes:
+    return struct.pack(f'<{len(signature)}Q', *signature)
+
+def _unpack(blob: bytes) -> Tuple[int, ...]:
+    return struct.unpack(f'<{len(blob) // 8}Q', blob)
+
+def find_duplicate(conn, signature: Tuple[int, ...], city: Optional[str], buckets: List[int]) -> Optional[int]:
+    """The cluster (canonical job id) a posting belongs to, or None if it is original"""
+    placeholders = ', '.join('(?, ?)' for _ in buckets)
+    params = [value for band, bucket in enumerate(buckets) for value in (band, bucket)]
+    candidates = conn.execute(f'''
+        WITH probe(band, bucket) AS (VALUES {placeholders}),
+        candidates AS (
+            SELECT DISTINCT lsh_buckets.id FROM probe
+            JOIN lsh_buckets ON lsh_buckets.band = probe.band AND lsh_buckets.bucket = probe.bucket
+        )
+        SELECT job_signatures.id, job_signatures.city, job_signatures.signature, jobs.duplicate_of
+        FROM candidates
+        JOIN job_signatures ON job_signatures.id = candidates.id
+        JOIN jobs ON jobs.id = candidates.id
+    ''', params).fetchall()
+
+    best, best_score = None, NEAR_DUPLICATE_THRESHOLD
+    for candidate_id, candidate_city, blob, duplicate_of in candidates:
+        # Same title in two different cities is two postings
+        if city and candidate_city and city != candidate_city:
+            continue
+        score = similarity(signature, _unpack(blob))
+        if score >= best_score:
+            best, best_score = duplicate_of or candidate_id, score
+    return best
+
+def index_jobs(conn, jobs: List[Tuple[int, Dict]]) -> Dict[int, int]:
+    """Find near-duplicates among newly inserted jobs and add them to the LSH index.
+
+    Each job's title signature is split into bands whose buckets (keyed by the
+    normalized company too) are looked up in ``lsh_buckets``, so candidates
+    cost a few primary-key lookups instead of a comparison with every stored
+    job. Candidates in another city are skipped; the best one whose estimated
+    similarity reaches NEAR_DUPLICATE_THRESHOLD links the job to its cluster's
+    first posting through ``duplicate_of``. Call inside the write transaction
+    that inserted the jobs.
+
+    ``jobs`` holds (jobs.id, job dict) pairs in insertion order, so a batch can
+    contain duplicates of its own earlier rows. Returns {id: canonical id} for
+    the jobs that turned out to be near-duplicates.
+    """
+    duplicates = {}
+    for row_id, job in jobs:
+        signature = minhash(job.get('title'))
+        company = company_key(job.get('company'))
+        city = parse_location(job.get('location'))['city']
+        city = ' '.join(_words(city)) or None
+        buckets = band_buckets(signature, company)
+
+        canonical = find_duplicate(conn, signature, city, buckets)
+        if canonical is not None and canonical != row_id:
+            # Duplicates are stored, but never shown or announced as new
+            duplicates[row_id] = canonical
+            conn.execute('UPDATE jobs SET duplicate_of = ?, is_new = 0 WHERE id = ?', (canonical, row_id))
+
+        conn.execute('INSERT OR REPLACE INTO job_signatures (id, company_key, city, signature) VALUES (?, ?, ?, ?)',
+                     (row_id, company, city, _pack(signature)))
+        conn.executemany('INSERT OR IGNORE INTO lsh_buckets (band, bucket, id) VALUES (?, ?, ?)',
+                         [(band, bucket, row_id) for band, bucket in enumerate(buckets)])
+    return duplicates
+
+def init_near_duplicates(conn):
+    """Signature and LSH tables, the duplicate_of cluster link, and a backfill of existing jobs"""
+    columns = {row[1] for row in conn.execute('PRAGMA table_xinfo(jobs)')}
+    if 'duplicate_of' not in columns:
+        conn.execute('ALTER TABLE jobs ADD COLUMN duplicate_of INTEGER')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_duplicate_of ON jobs(duplicate_of) WHERE duplicate_of IS NOT NULL')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS job_signatures (
+            id INTEGER PRIMARY KEY,
+            company_key TEXT NOT NULL,
+            city TEXT,
+            signature BLOB NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS lsh_buckets (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            id INTEGER NOT NULL,
+            PRIMARY KEY (band, bucket, id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_lsh_buckets_id ON lsh_buckets(id)')
+
+    # Deleted (or archived) jobs leave the index; their duplicates become canonical again
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS near_duplicates_delete AFTER DELETE ON jobs BEGIN
+            DELETE FROM job_signatures WHERE id = old.id;
+            DELETE FROM lsh_buckets WHERE id = old.id;
+            UPDATE jobs SET duplicate_of = NULL WHERE duplicate_of = old.id;
+        END
+    ''')
+
+    rows = conn.execute('''
+        SELECT id, title, company, location FROM jobs
+        WHERE id NOT IN (SELECT id FROM job_signatures)
+        ORDER BY id
+    ''').fetchall()
+    index_jobs(conn, [(row[0], {'title': row[1], 'company': row[2], 'location': row[3]}) for row in rows])
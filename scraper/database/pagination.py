@@ -0,0 +1,63 @@
+import base64
+import json
+from typing import List, Optional, Sequence, Tuple
+
+def encode_cursor(values: List) -> str:
+    """Pack keyset values into an opaque, URL-safe cursor"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii').rstrip('=')
+
+def _is_instance(value, types) -> bool:
+    # JSON true/false decode to bool, which is an int subclass but never a key
+    return isinstance(value, types) and not isinstance(value, bool)
+
+def decode_cursor(cursor: str, types: Optional[Sequence] = None) -> List:
+    """Unpack a cursor made by encode_cursor; raises ValueError if it is malformed.
+
+    With ``types`` (one type or tuple of types per value) the cursor must hold
+    exactly that many values of those types, so a tampered cursor is rejected
+    here instead of failing inside the query.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    if not isinstance(values, list):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    if types is not None and (len(values) != len(types)
+                              or not all(_is_instance(value, t) for value, t in zip(values, types))):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return values
+
+def jobs_page_query(columns: str, limit: int, cursor: Optional[str] = None, filter_new: bool = False,
+                    country: Optional[str] = None, province: Optional[str] = None,
+                    remote_only: bool = False) -> Tuple[str, List]:
+    """SQL and parameters for a page of jobs, newest first.
+
+    Selects ``limit + 1`` rows so the caller can tell whether a next page
+    exists; its cursor is ``[scraped_date, id]`` of the last row returned.
+    Every filter has an index ending in (scraped_date, id), so each page is a
+    walk down one index with no sort (see the keyset entries in HOT_QUERIES).
+    """
+    conditions = ["duplicate_of IS NULL"]  # near-duplicates only appear as their first posting
+    params = []
+    if filter_new:
+        conditions.append("is_new = 1")
+    if country:
+        conditions.append("country = ?")
+        params.append(country.upper())
+    if province:
+        conditions.append("province_code = ?")
+        params.append(province.upper())
+    if remote_only:
+        conditions.append("is_remote = 1")
+    if cursor:
+        # Keyset: continue strictly after the last row of the previous page
+        last_scraped, last_id = decode_cursor(cursor, (str, int))
+        conditions.append("(scraped_date, id) < (?, ?)")
+        params += [last_scraped, last_id]
+
+    query = (f"SELECT {columns} FROM jobs WHERE " + " AND ".join(conditions)
+             + " ORDER BY scraped_date DESC, id DESC LIMIT ?")
+    params.append(limit + 1)
+    return query, params
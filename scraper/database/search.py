@@ -0,0 +1,154 @@
+import re
+import sqlite3
+import unicodedata
+from typing import Callable, Dict, List, Optional
+
+from config.settings import SEARCH_MAX_CANDIDATES, SEARCH_PREFIX_TERMS
+from scraper.database.pagination import decode_cursor, encode_cursor
+
+# Column weights for bm25 ranking: title, company, location, description
+SEARCH_WEIGHTS = (10.0, 5.0, 3.0, 1.0)
+
+# Longest prefix jobs_fts keeps its own index for (prefix='2 3')
+PREFIX_INDEX_LENGTH = 3
+
+# The newest matches, straight from the FTS5 doclists: ORDER BY rowid DESC stops
+# after LIMIT rows, where ORDER BY rank would score and sort every match first
+CANDIDATES_SQL = '''
+    SELECT rowid AS id, rank
+    FROM jobs_fts
+    WHERE jobs_fts MATCH ?
+    ORDER BY rowid DESC
+    LIMIT ?
+'''
+
+_TOKEN = re.compile(r'\w+\*?')
+
+def _fold(word: str) -> str:
+    """A word as the unicode61 tokenizer indexes it: lower case, no diacritics"""
+    decomposed = unicodedata.normalize('NFD', word.lower())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+def prefix_terms(conn: sqlite3.Connection, prefix: str, limit: int = SEARCH_PREFIX_TERMS) -> Optional[List[str]]:
+    """Indexed words starting with a prefix, or None when there are more than ``limit``"""
+    prefix = _fold(prefix)
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    terms = [row[0] for row in conn.execute(
+        'SELECT term FROM jobs_fts_vocab WHERE term >= ? AND term < ? LIMIT ?', (prefix, upper, limit + 1)
+    )]
+    return None if len(terms) > limit else terms
+
+def build_match_query(text: str, expand: Optional[Callable[[str], Optional[List[str]]]] = None) -> Optional[str]:
+    """Turn free text into an FTS5 MATCH expression.
+
+    Every word must match (AND). Words ending in ``*`` and the last word are
+    prefix matches, so "quant intern tor" finds "Toronto". Words are quoted,
+    so FTS5 operators and punctuation in the input are inert.
+
+    FTS5 merges the whole doclist of every word a prefix covers before it
+    returns a row, so with ``expand`` (see prefix_terms) prefixes longer than
+    the prefix index are spelled out as an OR of the words they cover, which
+    FTS5 reads lazily. Returns None when nothing can match.
+    """
+    terms = []
+    tokens = _TOKEN.findall(text)
+    for i, token in enumerate(tokens):
+        word = token.rstrip('*')
+        prefix = token.endswith('*') or i == len(tokens) - 1
+        words = expand(word) if expand and prefix and len(word) > PREFIX_INDEX_LENGTH else None
+        if words == []:
+            return None  # no indexed word starts with it
+        if words:
+            terms.append('(' + ' OR '.join(f'"{w}"' for w in words) + ')')
+        else:
+            terms.append(f'"{word}"' + ('*' if prefix else ''))
+    return ' AND '.join(terms) or None
+
+def search_jobs(conn: sqlite3.Connection, text: str, limit: int = 20,
+                cursor: Optional[str] = None, max_candidates: int = SEARCH_MAX_CANDIDATES) -> Dict:
+    """Full-text search over jobs, best match first, with keyset pagination.
+
+    Only the newest ``max_candidates`` matches are ranked, so a word like
+    "intern" that matches nearly every posting costs no more than a rare one;
+    selective searches have fewer matches than that and are ranked in full.
+
+    Returns the page of jobs (with a highlighted description snippet) and a
+    ``next_cursor`` to pass back for the following page, or None at the end.
+    """
+    after, keyset = '', []
+    if cursor:
+        keyset = decode_cursor(cursor, ((int, float), int))
+        after = 'WHERE (candidates.rank, candidates.id) > (?, ?)'
+
+    match = build_match_query(text, lambda word: prefix_terms(conn, word))
+    if match is None:
+        return {'jobs': [], 'next_cursor': None}
+    params = [match, max_candidates] + keyset
+
+    # Rank the candidates, then fetch rows and build snippets only for the page being returned
+    rows = conn.execute(f'''
+        WITH candidates AS ({CANDIDATES_SQL}),
+        page AS (
+            SELECT candidates.id, candidates.rank FROM candidates
+            JOIN jobs ON jobs.id = candidates.id AND jobs.duplicate_of IS NULL  -- first posting only
+            {after}
+            ORDER BY candidates.rank, candidates.id
+            LIMIT ?
+        )
+        SELECT
+            jobs.id,
+            jobs.job_id,
+            jobs.title,
+            jobs.company,
+            jobs.location,
+            jobs.url,
+            jobs.source,
+            jobs.scraped_date as created_at,
+            jobs.is_new,
+            snippet(jobs_fts, 3, '<mark>', '</mark>', '…', 16) AS snippet,
+            page.rank AS rank
+        FROM page
+        JOIN jobs_fts ON jobs_fts.rowid = page.id AND jobs_fts MATCH ?
+        JOIN jobs ON jobs.id = page.id
+        ORDER BY page.rank, page.id
+    ''', params + [limit + 1, match]).fetchall()
+
+    jobs = [dict(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = jobs[-1]
+        next_cursor = encode_cursor([last['rank'], last['id']])
+
+    for job in jobs:
+        del job['id']
+        del job['rank']
+    return {'jobs': jobs, 'next_cursor': next_cursor}
+
+def main(argv: List[str] = None) -> int:
+    """Command line entry point: python -m scraper.database.search "query" [--db path]"""
+    import argparse
+    import time
+    from config.settings import DATABASE_PATH
+    from scraper.database.connection import get_connection_manager
+
+    parser = argparse.ArgumentParser(description="Search jobs and time the query")
+    parser.add_argument('query', nargs='+', help="search text; several queries are timed one after another")
+    parser.add_argument('--db', default=DATABASE_PATH, help=f"database to search (default: {DATABASE_PATH})")
+    parser.add_argument('--limit', type=int, default=20, help="results per page")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per query; the fastest is reported")
+    args = parser.parse_args(argv)
+
+    conn = get_connection_manager(args.db).reader()
+    for text in args.query:
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            results = search_jobs(conn, text, args.limit)
+            timings.append(time.perf_counter() - started)
+        print(f"{text!r}: {len(results['jobs'])} jobs in {min(timings) * 1000:.1f} ms "
+              f"(median {sorted(timings)[len(timings) // 2] * 1000:.1f} ms)")
+    return 0
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
@@ -0,0 +1,131 @@
+import hashlib
+import math
+import sys
+from typing import Dict, Iterable, List, Optional
+
+from config.settings import SEEN_INDEX_BLOOM_ABOVE, SEEN_INDEX_FALSE_POSITIVE_RATE
+
+def _digest(job_id: str) -> int:
+    """128-bit hash of a job ID"""
+    return int.from_bytes(hashlib.blake2b(job_id.encode('utf-8'), digest_size=16).digest(), 'big')
+
+class _BloomLayer:
+    """One fixed-size Bloom filter sized for ``capacity`` IDs"""
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        self.capacity = capacity
+        self.bits = max(8, int(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, digest: int) -> Iterable[int]:
+        # Double hashing: two 64-bit halves generate all k positions
+        h1, h2 = digest >> 64, (digest & 0xFFFFFFFFFFFFFFFF) | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def add(self, digest: int):
+        for position in self._positions(digest):
+            self.array[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, digest: int) -> bool:
+        return all(self.array[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(digest))
+
+class SeenIndex:
+    """In-memory index of job IDs already stored, consulted before SQLite.
+
+    By default it is a set of 64-bit hashes of the IDs, which is far
+    smaller than keeping the ID strings and, at these sizes, collision free.
+    Given a ``false_positive_rate`` it becomes a Bloom filter instead: a
+    fraction of never-seen jobs will then be reported as seen (and skipped),
+    in exchange for a few bytes per ID.
+    The filter grows by adding layers, each twice the size of the previous
+    one with a tighter error rate, so the overall rate stays near the target.
+    """
+
+    def __init__(self, expected: int = 0, false_positive_rate: Optional[float] = None):
+        self.false_positive_rate = false_positive_rate
+        self._ids = set() if false_positive_rate is None else None
+        self._layers: List[_BloomLayer] = []
+        self._expected = max(expected, 1024)
+        self.lookups = 0
+        self.hits = 0
+
+    @classmethod
+    def from_ids(cls, job_ids: Iterable[str], count: int,
+                 bloom_above: int = SEEN_INDEX_BLOOM_ABOVE,
+                 false_positive_rate: float = SEEN_INDEX_FALSE_POSITIVE_RATE) -> 'SeenIndex':
+        """Build an index for ``count`` stored IDs, switching to a Bloom filter for large histories"""
+        use_bloom = bloom_above is not None and count > bloom_above
+        index = cls(count * 2, false_positive_rate if use_bloom else None)
+        index.update(job_ids)
+        return index
+
+    @property
+    def is_bloom(self) -> bool:
+        return self._ids is None
+
+    def _add_digest(self, digest: int):
+        if self._ids is not None:
+            self._ids.add(digest >> 64)
+            return
+
+        layer = self._layers[-1] if self._layers else None
+        if layer is None or layer.count >= layer.capacity:
+            # Each new layer halves its error rate so the sum converges on the target
+            capacity = self._expected * 2 ** len(self._layers)
+            rate = self.false_positive_rate / 2 ** (len(self._layers) + 1)
+            layer = _BloomLayer(capacity, rate)
+            self._layers.append(layer)
+        layer.add(digest)
+
+    def add(self, job_id: str):
+        """Record a stored job ID"""
+        if job_id:
+            self._add_digest(_digest(job_id))
+
+    def update(self, job_ids: Iterable[str]):
+        """Record many stored job IDs"""
+        for job_id in job_ids:
+            self.add(job_id)
+
+    def __contains__(self, job_id: str) -> bool:
+        self.lookups += 1
+        if not job_id:
+            return False
+
+        digest = _digest(job_id)
+        if self._ids is not None:
+            found = (digest >> 64) in self._ids
+        else:
+            found = any(digest in layer for layer in self._layers)
+
+        if found:
+            self.hits += 1
+        return found
+
+    def __len__(self) -> int:
+        if self._ids is not None:
+            return len(self._ids)
+        return sum(layer.count for layer in self._layers)
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the index"""
+        if self._ids is not None:
+            # Set table plus one int object per member
+            return sys.getsizeof(self._ids) + len(self._ids) * sys.getsizeof(2 ** 63)
+        return sum(len(layer.array) for layer in self._layers)
+
+    def stats(self) -> Dict:
+        """Size, memory use and lookup hit rate"""
+        return {
+            'kind': 'bloom' if self.is_bloom else 'set',
+            'ids': len(self),
+            'memory_bytes': self.memory_bytes(),
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'hit_rate': self.hits / self.lookups if self.lookups else 0.0,
+            'false_positive_rate': self.false_positive_rate if self.is_bloom else 0.0
+        }
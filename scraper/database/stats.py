@@ -0,0 +1,149 @@
+import sqlite3
+from typing import Dict, List, Optional
+
+# Rollup scopes: (scope, key expression, row filter), written against a row alias
+STAT_SCOPES = (
+    ('all', "''", '1'),
+    ('source', '{row}.source', '{row}.source IS NOT NULL'),
+    ('day', 'date({row}.scraped_date)', 'date({row}.scraped_date) IS NOT NULL'),
+    ('province', '{row}.province_code', "{row}.country = 'CA' AND {row}.province_code IS NOT NULL"),
+    ('region', "'canada_or_remote'", "({row}.country = 'CA' OR {row}.is_remote = 1)"),
+)
+
+# Columns whose change moves a job between rollup rows
+STAT_COLUMNS = ('is_new', 'source', 'scraped_date', 'country', 'province_code', 'is_remote')
+
+def _apply(row: str, sign: int) -> str:
+    """Trigger statements adding (sign=1) or removing (sign=-1) one job from every scope"""
+    statements = []
+    for scope, key, condition in STAT_SCOPES:
+        statements.append(f'''
+            INSERT INTO job_stats (scope, key, total_count, new_count)
+            SELECT '{scope}', {key.format(row=row)}, {sign}, {sign} * ({row}.is_new IS 1)
+            WHERE {condition.format(row=row)}
+            ON CONFLICT (scope, key) DO UPDATE SET
+                total_count = total_count + excluded.total_count,
+                new_count = new_count + excluded.new_count;''')
+    return ''.join(statements)
+
+def init_stats(cursor: sqlite3.Cursor):
+    """Create the job_stats rollup and the triggers that keep it current"""
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'job_stats'"
+    ).fetchone()
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS job_stats (
+            scope TEXT NOT NULL,
+            key TEXT NOT NULL,
+            total_count INTEGER NOT NULL DEFAULT 0,
+            new_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (scope, key)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS job_stats_insert AFTER INSERT ON jobs BEGIN
+            {_apply('new', 1)}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS job_stats_delete AFTER DELETE ON jobs BEGIN
+            {_apply('old', -1)}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS job_stats_update
+        AFTER UPDATE OF {', '.join(STAT_COLUMNS)} ON jobs BEGIN
+            {_apply('old', -1)}
+            {_apply('new', 1)}
+        END
+    ''')
+
+    if not exists:
+        rebuild_stats(cursor)
+
+def _expected_stats_sql() -> str:
+    """The rollup computed from scratch over jobs"""
+    return ' UNION ALL '.join(f'''
+        SELECT '{scope}' AS scope, {key.format(row='jobs')} AS key,
+               COUNT(*) AS total_count, SUM(jobs.is_new IS 1) AS new_count
+        FROM jobs
+        WHERE {condition.format(row='jobs')}
+        GROUP BY 2
+    ''' for scope, key, condition in STAT_SCOPES)
+
+def rebuild_stats(conn):
+    """Recompute the rollup from the jobs table (call inside a write transaction)"""
+    conn.execute('DELETE FROM job_stats')
+    conn.execute(f'INSERT INTO job_stats (scope, key, total_count, new_count) {_expected_stats_sql()}')
+
+def check_stats(conn) -> List[Dict]:
+    """Compare the rollup with a full recount; returns the rows that disagree"""
+    rows = conn.execute(f'''
+        WITH expected AS ({_expected_stats_sql()}),
+        stored AS (SELECT * FROM job_stats WHERE total_count != 0 OR new_count != 0)
+        SELECT expected.scope, expected.key,
+               expected.total_count AS expected_total, stored.total_count AS stored_total,
+               expected.new_count AS expected_new, stored.new_count AS stored_new
+        FROM expected
+        LEFT JOIN stored ON stored.scope = expected.scope AND stored.key = expected.key
+        WHERE stored.total_count IS NOT expected.total_count OR stored.new_count IS NOT expected.new_count
+        UNION ALL
+        SELECT stored.scope, stored.key, NULL, stored.total_count, NULL, stored.new_count
+        FROM stored
+        LEFT JOIN expected ON expected.scope = stored.scope AND expected.key = stored.key
+        WHERE expected.scope IS NULL
+    ''').fetchall()
+    return [dict(row) for row in rows]
+
+def read_job_stats(conn, days: int = 30) -> Dict:
+    """Dashboard statistics read from the rollup, independent of table size"""
+    def scope_rows(scope: str, name: str, order: str = 'total_count DESC', limit: int = -1):
+        cursor = conn.execute(f'''
+            SELECT key, total_count FROM job_stats
+            WHERE scope = ? AND total_count > 0
+            ORDER BY {order}
+            LIMIT ?
+        ''', (scope, limit))
+        return [{name: key, 'count': count} for key, count in cursor.fetchall()]
+
+    totals = conn.execute(
+        "SELECT total_count, new_count FROM job_stats WHERE scope = 'all'"
+    ).fetchone()
+    region = conn.execute(
+        "SELECT total_count FROM job_stats WHERE scope = 'region'"
+    ).fetchone()
+
+    return {
+        'total': totals[0] if totals else 0,
+        'new_jobs': totals[1] if totals else 0,
+        'canada_or_remote': region[0] if region else 0,
+        'sources': scope_rows('source', 'source'),
+        'provinces': scope_rows('province', 'province_code'),
+        'daily': scope_rows('day', 'date', order='key DESC', limit=days)
+    }
+
+def read_keyword_yield(conn, days: Optional[int] = None, source: Optional[str] = None) -> List[Dict]:
+    """Jobs found per source and search keyword (or custom page), most productive first.
+
+    Runs on the indexed metadata columns, so it reads idx_source_yield instead
+    of decoding every row's metadata JSON.
+    """
+    conditions, params = [], []
+    if days is not None:
+        conditions.append("scraped_date >= datetime('now', ?)")
+        params.append(f'-{int(days)} days')
+    if source is not None:
+        conditions.append('source = ?')
+        params.append(source)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+    rows = conn.execute(f'''
+        SELECT source, keyword, source_url,
+               COUNT(*) AS jobs, SUM(is_new IS 1) AS new_jobs,
+               MIN(scraped_date) AS first_seen, MAX(scraped_date) AS last_seen
+        FROM jobs
+        {where}
+        GROUP BY source, keyword, source_url
+    ''', params).fetchall()
+    return sorted((dict(row) for row in rows), key=lambda row: row['jobs'], reverse=True)
@@ -0,0 +1,138 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import requests
+
+from config.settings import HTTP_CACHE_PATH, HTTP_CACHE_TTL, HTTP_CACHE_MAX_ENTRIES
+
+class ResponseCache:
+    """Persistent store of HTTP validators for conditional requests.
+
+    For every URL it remembers the ``ETag``/``Last-Modified`` of the last
+    successful response so the next fetch can send ``If-None-Match`` /
+    ``If-Modified-Since``. Bodies are not kept: a 304 simply means the page
+    has nothing new and the caller skips parsing. Entries older than the TTL
+    are ignored and the least recently used ones are evicted once the cache
+    grows past ``max_entries``.
+
+    New validators are held back until ``commit`` is called, which the
+    scrapers only do once the page's jobs are stored: a page whose parsing
+    or storing failed (or a run that died) is fetched in full next time
+    instead of coming back as an empty 304. ``discard`` drops the held-back
+    validators of a single page.
+    """
+
+    def __init__(self, db_path: str = HTTP_CACHE_PATH, ttl: int = HTTP_CACHE_TTL,
+                 max_entries: int = HTTP_CACHE_MAX_ENTRIES):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.pending: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self._lock = threading.Lock()
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.init_database()
+
+    def init_database(self):
+        """Create the cache table"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    stored_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_http_cache_last_used ON http_cache(last_used)')
+            conn.commit()
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Get the If-None-Match / If-Modified-Since headers for a URL"""
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                'SELECT etag, last_modified, stored_at FROM http_cache WHERE url = ?', (url,)
+            ).fetchone()
+
+            if not row:
+                return {}
+
+            etag, last_modified, stored_at = row
+            if time.time() - stored_at > self.ttl:
+                conn.execute('DELETE FROM http_cache WHERE url = ?', (url,))
+                conn.commit()
+                return {}
+
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def record(self, url: str, response: requests.Response):
+        """Update the cache from a response; new validators wait for ``commit``"""
+        with self._lock:
+            if response.status_code == 304:
+                self.hits += 1
+                with sqlite3.connect(self.db_path) as conn:
+                    conn.execute('UPDATE http_cache SET last_used = ? WHERE url = ?', (time.time(), url))
+                    conn.commit()
+                return
+
+            self.misses += 1
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if etag or last_modified:
+                self.pending[url] = (etag, last_modified)
+                return
+
+            # No validators: forget the old ones right away, the next fetch is unconditional anyway
+            self.pending.pop(url, None)
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute('DELETE FROM http_cache WHERE url = ?', (url,))
+                conn.commit()
+
+    def commit(self, urls: Optional[Iterable[str]] = None):
+        """Store the held-back validators of the given pages (default: every page)"""
+        with self._lock:
+            urls = list(self.pending) if urls is None else [url for url in urls if url in self.pending]
+            if not urls:
+                return
+
+            now = time.time()
+            rows = [(url, *self.pending.pop(url), now, now) for url in urls]
+            with sqlite3.connect(self.db_path) as conn:
+                conn.executemany('''
+                    INSERT OR REPLACE INTO http_cache (url, etag, last_modified, stored_at, last_used)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', rows)
+                self._evict(conn)
+                conn.commit()
+
+    def discard(self, url: str):
+        """Drop a page's held-back validators, so it is fetched in full next time"""
+        with self._lock:
+            self.pending.pop(url, None)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop expired entries and trim the cache to max_entries"""
+        conn.execute('DELETE FROM http_cache WHERE stored_at < ?', (time.time() - self.ttl,))
+        conn.execute('''
+            DELETE FROM http_cache WHERE url NOT IN (
+                SELECT url FROM http_cache ORDER BY last_used DESC LIMIT ?
+            )
+        ''', (self.max_entries,))
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            self.pending.clear()
+            conn.execute('DELETE FROM http_cache')
+            conn.commit()
@@ -0,0 +1,165 @@
+import asyncio
+import random
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scraper.fetching.cache import ResponseCache
+from scraper.fetching.rate_limiter import RateLimiter, get_rate_limiter
+from scraper.fetching.snapshots import SnapshotStore
+
+from config.settings import (
+    USER_AGENTS, MAX_RETRIES, REQUEST_TIMEOUT,
+    MAX_CONCURRENT_REQUESTS, MAX_CONCURRENT_PER_HOST, HTTP_CACHE_ENABLED, SNAPSHOTS_ENABLED
+)
+
+class AsyncFetcher:
+    """Concurrent HTTP fetch engine with per-host concurrency caps.
+
+    Requests are driven by asyncio and executed on a small thread pool, so
+    many URLs can be in flight at once. Each host gets its own keep-alive
+    ``requests.Session`` and a semaphore that caps parallel requests to it,
+    and politeness is delegated to the shared per-host ``RateLimiter``, so
+    total run time grows with the number of hosts rather than the number of
+    URLs. When a ``ResponseCache`` is attached, requests are made conditional
+    and unchanged pages come back as 304 responses. Fetched pages can be
+    recorded to a ``SnapshotStore``; with ``replay`` set, pages are served
+    from a store instead and the network is never touched. A recording
+    fetcher gets no cache by default: a 304 has no page to record, and a
+    replay would then miss that page or serve an older copy.
+    """
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+                 per_host: int = MAX_CONCURRENT_PER_HOST,
+                 timeout: int = REQUEST_TIMEOUT,
+                 rate_limiter: RateLimiter = None,
+                 cache: ResponseCache = None,
+                 snapshots: SnapshotStore = None,
+                 replay: SnapshotStore = None,
+                 replay_at: str = None):
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.replay = replay
+        self.replay_at = replay_at
+        if snapshots is None and SNAPSHOTS_ENABLED and not replay:
+            snapshots = SnapshotStore()
+        self.snapshots = snapshots
+        if cache is None and HTTP_CACHE_ENABLED and not replay and not snapshots:
+            cache = ResponseCache()
+        self.cache = cache
+        self.user_agent = random.choice(USER_AGENTS)
+
+        self._sessions: Dict[str, requests.Session] = {}
+        self._sessions_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency,
+                                            thread_name_prefix='fetcher')
+        # asyncio semaphores are bound to the loop they are first used on,
+        # so keep a separate set per event loop
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _session_for(self, host: str) -> requests.Session:
+        """Get (or create) the keep-alive session for a host"""
+        with self._sessions_lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                session.headers.update({'User-Agent': self.user_agent})
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.per_host)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._sessions[host] = session
+            return session
+
+    def _host_semaphore(self, host: str) -> asyncio.Semaphore:
+        """Get the semaphore capping concurrent requests to a host"""
+        loop = asyncio.get_running_loop()
+        semaphores = self._semaphores.setdefault(loop, {})
+        if host not in semaphores:
+            semaphores[host] = asyncio.Semaphore(self.per_host)
+        return semaphores[host]
+
+    def _get(self, url: str, host: str) -> requests.Response:
+        """Blocking GET run on the worker pool"""
+        headers = self.cache.conditional_headers(url) if self.cache else {}
+        response = self._session_for(host).get(url, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+
+        if self.cache:
+            self.cache.record(url, response)
+        if self.snapshots and response.status_code == 200:
+            self.snapshots.save(url, response)
+        return response
+
+    async def fetch(self, url: str, retries: int = MAX_RETRIES) -> requests.Response:
+        """Fetch a URL with retry logic, respecting the host's rate limit and cap"""
+        host = urlsplit(url).hostname or ''
+        loop = asyncio.get_running_loop()
+
+        if self.replay:
+            return await loop.run_in_executor(self._executor, self.replay.response_for, url, self.replay_at)
+
+        for attempt in range(retries):
+            await self.rate_limiter.acquire(host)
+            try:
+                async with self._host_semaphore(host):
+                    return await loop.run_in_executor(self._executor, self._get, url, host)
+            except requests.RequestException as e:
+                if attempt == retries - 1:
+                    raise e
+                # Exponential backoff applies to the whole host, not just this URL;
+                # an unthrottled host has no bucket to push back, so this request waits itself
+                if not self.rate_limiter.penalize(host, 2 ** attempt):
+                    await asyncio.sleep(2 ** attempt)
+
+        raise requests.RequestException("Max retries exceeded")
+
+    async def fetch_all(self, urls: List[str],
+                        retries: int = MAX_RETRIES) -> List[Union[requests.Response, Exception]]:
+        """Fetch many URLs concurrently, returning responses or exceptions in order"""
+        return await asyncio.gather(
+            *(self.fetch(url, retries) for url in urls),
+            return_exceptions=True
+        )
+
+    def fetch_sync(self, url: str, retries: int = MAX_RETRIES) -> requests.Response:
+        """Blocking wrapper around fetch"""
+        return asyncio.run(self.fetch(url, retries))
+
+    def fetch_many(self, urls: List[str],
+                   retries: int = MAX_RETRIES) -> List[Union[requests.Response, Exception]]:
+        """Blocking wrapper around fetch_all"""
+        if not urls:
+            return []
+        return asyncio.run(self.fetch_all(urls, retries))
+
+    def fetch_each(self, urls: List[str],
+                   on_response: Callable[[int, Union[requests.Response, Exception]], None],
+                   retries: int = MAX_RETRIES):
+        """Fetch many URLs concurrently, calling on_response(index, response or exception) as each one finishes"""
+        async def fetch_one(index: int, url: str):
+            try:
+                response = await self.fetch(url, retries)
+            except Exception as e:
+                response = e
+            on_response(index, response)
+
+        async def fetch_all():
+            await asyncio.gather(*(fetch_one(index, url) for index, url in enumerate(urls)))
+
+        if urls:
+            asyncio.run(fetch_all())
+
+    def close(self):
+        """Close pooled connections and stop the worker threads"""
+        with self._sessions_lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+from config.settings import DEFAULT_RATE_LIMIT, HOST_RATE_LIMITS
+
+class TokenBucket:
+    """Token bucket that hands out reservations instead of blocking.
+
+    Tokens may go negative: each caller takes one token and is told how long
+    to wait for it, so concurrent callers queue up in reservation order.
+    A rate of ``None`` means the host is not throttled at all.
+    """
+
+    def __init__(self, rate: Optional[float], burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        if self.rate:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take a token and return the number of seconds to wait for it"""
+        if not self.rate:
+            return 0.0
+
+        self._refill(time.monotonic())
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def penalize(self, seconds: float) -> bool:
+        """Push back every future reservation by the given number of seconds (False if unthrottled)"""
+        if not self.rate:
+            return False
+
+        self._refill(time.monotonic())
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+        return True
+
+class RateLimiter:
+    """Per-host token-bucket rate limiter shared by all scrapers in the process.
+
+    Limits are looked up by host name, falling back to parent domains so that
+    a ``linkedin.com`` entry also covers ``www.linkedin.com`` and
+    ``ca.linkedin.com`` (which then share one bucket). Hosts without an entry
+    get ``DEFAULT_RATE_LIMIT``.
+    """
+
+    def __init__(self, default: Optional[Dict] = None, limits: Optional[Dict[str, Dict]] = None):
+        self.default = dict(default if default is not None else DEFAULT_RATE_LIMIT)
+        self.limits: Dict[str, Dict] = {}
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.waited: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        for host, limit in (limits if limits is not None else HOST_RATE_LIMITS).items():
+            self.configure(host, **limit)
+
+    def configure(self, host: str, rate: Optional[float] = None, burst: int = 1):
+        """Set (or replace) the token bucket for a host"""
+        host = host.lower()
+        with self._lock:
+            self.limits[host] = {'rate': rate, 'burst': burst}
+            self.buckets[host] = TokenBucket(rate, burst)
+
+    def _bucket_for(self, host: str) -> TokenBucket:
+        """Find the bucket for a host, creating a default one if needed"""
+        host = (host or '').lower()
+        parts = host.split('.')
+        for i in range(len(parts)):
+            key = '.'.join(parts[i:])
+            if key in self.limits:
+                return self.buckets[key]
+
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.default.get('rate'), self.default.get('burst', 1))
+        return self.buckets[host]
+
+    def reserve(self, host: str) -> float:
+        """Reserve one request against a host and return the wait in seconds"""
+        with self._lock:
+            wait = self._bucket_for(host).reserve()
+            if wait > 0:
+                self.waited[host] = self.waited.get(host, 0.0) + wait
+            return wait
+
+    async def acquire(self, host: str):
+        """Wait (asynchronously) until a request to the host is allowed"""
+        wait = self.reserve(host)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self, host: str):
+        """Blocking version of acquire"""
+        wait = self.reserve(host)
+        if wait > 0:
+            time.sleep(wait)
+
+    def penalize(self, host: str, seconds: float) -> bool:
+        """Back off a host after a failed request; False if the host has no rate to push back"""
+        with self._lock:
+            return self._bucket_for(host).penalize(seconds)
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the process-wide rate limiter"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter()
+        return _shared_limiter
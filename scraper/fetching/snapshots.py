@@ -0,0 +1,138 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+
+from config.settings import SNAPSHOT_PATH, SNAPSHOT_COMPRESSION
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+class SnapshotStore:
+    """Content-addressed, compressed store of raw fetched pages.
+
+    Bodies are stored once per SHA-256 of their content under
+    ``<root>/objects/ab/<hash>.<codec>``, compressed with zstd when the
+    ``zstandard`` package is installed and gzip otherwise. An SQLite index
+    records every fetch (URL, timestamp, hash), so the same page fetched on
+    many runs costs one blob. ``response_for`` rebuilds a response from the
+    store, which is what offline replay runs on.
+    """
+
+    def __init__(self, root: str = SNAPSHOT_PATH, compression: str = SNAPSHOT_COMPRESSION):
+        self.root = Path(root)
+        self.codec = 'zst' if compression == 'zstd' and ZSTD_AVAILABLE else 'gz'
+        self.index_path = self.root / 'index.db'
+        self._lock = threading.Lock()
+
+        (self.root / 'objects').mkdir(parents=True, exist_ok=True)
+        self.init_database()
+
+    def init_database(self):
+        """Create the snapshot index"""
+        with sqlite3.connect(self.index_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT NOT NULL,
+                    fetched_at TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    codec TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    content_type TEXT
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_snapshots_url ON snapshots(url, fetched_at)')
+            conn.commit()
+
+    def _blob_path(self, digest: str, codec: str) -> Path:
+        return self.root / 'objects' / digest[:2] / f"{digest}.{codec}"
+
+    def _compress(self, content: bytes) -> bytes:
+        if self.codec == 'zst':
+            return zstandard.ZstdCompressor().compress(content)
+        return gzip.compress(content)
+
+    @staticmethod
+    def _decompress(data: bytes, codec: str) -> bytes:
+        if codec == 'zst':
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("zstandard is required to read .zst snapshots")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def save(self, url: str, response: requests.Response) -> str:
+        """Store a response body and index it; returns the content hash"""
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+
+        with self._lock:
+            with sqlite3.connect(self.index_path) as conn:
+                row = conn.execute(
+                    'SELECT codec FROM snapshots WHERE sha256 = ? LIMIT 1', (digest,)
+                ).fetchone()
+                codec = row[0] if row else self.codec
+
+                path = self._blob_path(digest, codec)
+                if not path.exists():
+                    path.parent.mkdir(exist_ok=True)
+                    tmp_path = path.with_suffix('.tmp')
+                    tmp_path.write_bytes(self._compress(content))
+                    os.replace(tmp_path, path)
+
+                conn.execute('''
+                    INSERT INTO snapshots (url, fetched_at, sha256, codec, size, content_type)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (url, datetime.now().isoformat(), digest, codec, len(content),
+                      response.headers.get('Content-Type')))
+                conn.commit()
+
+        return digest
+
+    def latest(self, url: str, at: Optional[str] = None) -> Optional[Dict]:
+        """Get the newest snapshot of a URL, optionally as of an ISO timestamp"""
+        with sqlite3.connect(self.index_path) as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute('''
+                SELECT * FROM snapshots
+                WHERE url = ? AND fetched_at <= ?
+                ORDER BY fetched_at DESC LIMIT 1
+            ''', (url, at or datetime.max.isoformat())).fetchone()
+            return dict(row) if row else None
+
+    def load(self, snapshot: Dict) -> bytes:
+        """Read and decompress a snapshot's body"""
+        path = self._blob_path(snapshot['sha256'], snapshot['codec'])
+        return self._decompress(path.read_bytes(), snapshot['codec'])
+
+    def response_for(self, url: str, at: Optional[str] = None) -> requests.Response:
+        """Rebuild a response for a URL from the store (used for offline replay)"""
+        snapshot = self.latest(url, at)
+        if snapshot is None:
+            raise requests.RequestException(f"No snapshot for {url}")
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = self.load(snapshot)
+        if snapshot['content_type']:
+            response.headers['Content-Type'] = snapshot['content_type']
+        return response
+
+    def history(self, url: str) -> List[Dict]:
+        """Every recorded fetch of a URL, newest first"""
+        with sqlite3.connect(self.index_path) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.execute(
+                'SELECT * FROM snapshots WHERE url = ? ORDER BY fetched_at DESC', (url,)
+            )
+            return [dict(row) for row in cursor.fetchall()]
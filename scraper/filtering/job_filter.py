@@ -0,0 +1,133 @@
+import re
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Rule name -> the job fields its keywords are matched in
+RULE_FIELDS = {
+    'excluded_keywords': ('title',),
+    'included_keywords': ('title', 'description'),
+    'required_skills': ('title', 'description'),
+    'locations': ('location',),
+}
+FIELDS = ('title', 'location', 'description')
+
+def _normalize(term: str) -> str:
+    return ' '.join(term.casefold().split())
+
+def _term_pattern(term: str) -> str:
+    """A keyword as a regex: any run of whitespace but newlines between words, and no word characters on either side"""
+    words = [re.escape(word) for word in term.split()]
+    # Newlines only separate fields (see matches), so a keyword never spans two of them
+    return r'(?<!\w)' + r'[^\S\n]+'.join(words) + r'(?!\w)'
+
+class JobFilter:
+    """The ``filters`` block of job_sources.yaml, compiled into a single regex.
+
+    Every keyword of every rule goes into one case-insensitive alternation
+    (longest first, matched on word boundaries), so a job is checked in a
+    single scan over its title, location and description. A job is rejected
+    when its title contains an excluded keyword, when it has none of the
+    included keywords, when its description mentions none of the required
+    skills, when its location names none of the wanted locations, or when its
+    salary range lies outside min_salary/max_salary. Missing fields never
+    reject: LinkedIn cards carry no description, so skills are only checked
+    when one was scraped, and an unknown location or salary passes.
+
+    ``check`` returns the rule that rejected a job (None if it passes);
+    ``apply`` filters a stream of jobs and counts rejections per rule.
+    """
+
+    def __init__(self, filters: Optional[Dict] = None):
+        filters = filters or {}
+        self.rules: Dict[str, set] = {}
+        self.min_salary = filters.get('min_salary')
+        self.max_salary = filters.get('max_salary')
+        self.rejections = Counter()
+        self.accepted = 0
+
+        term_rules: Dict[str, set] = {}
+        for rule in RULE_FIELDS:
+            terms = {_normalize(str(term)) for term in filters.get(rule) or []}
+            terms.discard('')
+            if terms:
+                self.rules[rule] = terms
+                for term in terms:
+                    term_rules.setdefault(term, set()).add(rule)
+        self._term_rules = term_rules
+
+        self.pattern = None
+        if term_rules:
+            # Longest first, so "phd student" wins over "phd" at the same position
+            terms = sorted(term_rules, key=len, reverse=True)
+            self.pattern = re.compile('|'.join(_term_pattern(term) for term in terms), re.IGNORECASE)
+
+    def __bool__(self) -> bool:
+        return bool(self.rules) or self.min_salary is not None or self.max_salary is not None
+
+    def matches(self, job: Dict) -> Dict[str, List[str]]:
+        """Keywords found in a job, by rule (only counting matches in the rule's fields)"""
+        values = [job.get(field) or '' for field in FIELDS]
+        # Line breaks inside a field become spaces (same length, so offsets still line up)
+        values = ['' if value == 'N/A' else value.replace('\n', ' ') for value in values]
+
+        # One scan over all fields joined together; match offsets tell the fields apart
+        ends, offset = [], 0
+        for value in values:
+            offset += len(value) + 1
+            ends.append(offset)
+        text = '\n'.join(values)
+
+        found: Dict[str, List[str]] = {}
+        for match in self.pattern.finditer(text):
+            field = FIELDS[next(i for i, end in enumerate(ends) if match.start() < end)]
+            term = _normalize(match.group())
+            for rule in self._term_rules.get(term, ()):
+                if field in RULE_FIELDS[rule]:
+                    found.setdefault(rule, []).append(term)
+        return found
+
+    def check(self, job: Dict) -> Optional[str]:
+        """The reason a job is rejected, e.g. "excluded_keywords: senior", or None if it passes"""
+        if not self:
+            return None
+        found = self.matches(job) if self.pattern else {}
+
+        if 'excluded_keywords' in found:
+            return f"excluded_keywords: {found['excluded_keywords'][0]}"
+        if 'included_keywords' in self.rules and 'included_keywords' not in found:
+            return 'included_keywords: none found'
+        description = job.get('description')
+        if 'required_skills' in self.rules and 'required_skills' not in found \
+                and description and description != 'N/A':
+            return 'required_skills: none found'
+        location = job.get('location')
+        if 'locations' in self.rules and 'locations' not in found \
+                and location and location != 'N/A':
+            return f'locations: {location}'
+
+        # Salaries are only known for some custom sites; a range outside the wanted one rejects
+        if self.min_salary is not None and job.get('salary_max') is not None \
+                and job['salary_max'] < self.min_salary:
+            return f"min_salary: {job['salary_max']:g}"
+        if self.max_salary is not None and job.get('salary_min') is not None \
+                and job['salary_min'] > self.max_salary:
+            return f"max_salary: {job['salary_min']:g}"
+        return None
+
+    def apply(self, jobs: Iterable[Dict]) -> Iterator[Dict]:
+        """Yield the jobs that pass, counting the rest in ``rejections`` by rule"""
+        for job in jobs:
+            reason = self.check(job)
+            if reason is None:
+                self.accepted += 1
+                yield job
+            else:
+                self.rejections[reason.split(':')[0]] += 1
+
+    def stats(self) -> Dict:
+        """Accepted and rejected counts since the filter was built"""
+        return {
+            'accepted': self.accepted,
+            'rejected': sum(self.rejections.values()),
+            'rejections': dict(self.rejections)
+        }
@@ -0,0 +1,179 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer, UnicodeDammit
+
+from config.settings import HTML_PARSER_BACKEND
+
+try:
+    import lxml.html
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# A card spec describes the repeated element holding one job and the fields to
+# pull out of it. Each field is (tag, class, attribute): the first descendant
+# with that tag (and class, if given) is located and either its stripped text
+# (attribute None) or the attribute value is returned. Fields whose element is
+# missing are left out of the result; a missing attribute gives None.
+LINKEDIN_CARD = {
+    'container': ('div', 'base-card'),
+    'fields': {
+        'title': ('h3', 'base-search-card__title', None),
+        'company': ('h4', 'base-search-card__subtitle', None),
+        'location': ('span', 'job-search-card__location', None),
+        'url': ('a', 'base-card__full-link', 'href'),
+        'posted_date': ('time', None, 'datetime')
+    }
+}
+
+class ParserBackend(ABC):
+    """HTML parser backend used by the scrapers"""
+
+    name = ''
+
+    @abstractmethod
+    def extract_cards(self, content: bytes, spec: Dict) -> List[Dict[str, Optional[str]]]:
+        """Extract the fields of every card matching the spec, in document order"""
+        pass
+
+    def soup(self, content: bytes, parse_only: SoupStrainer = None) -> BeautifulSoup:
+        """Parse a whole document into a BeautifulSoup tree"""
+        return BeautifulSoup(content, 'html.parser', parse_only=parse_only)
+
+def _has_class(class_: str):
+    """Strainer matcher for one class token (strainers see the raw attribute string)"""
+    def matches(value) -> bool:
+        if not value:
+            return False
+        return class_ in (value.split() if isinstance(value, str) else value)
+    return matches
+
+class BeautifulSoupBackend(ParserBackend):
+    """BeautifulSoup with html.parser or lxml, building only the card subtrees"""
+
+    def __init__(self, features: str = 'html.parser'):
+        self.name = features
+        self.features = features
+
+    def soup(self, content: bytes, parse_only: SoupStrainer = None) -> BeautifulSoup:
+        return BeautifulSoup(content, self.features, parse_only=parse_only)
+
+    def extract_cards(self, content: bytes, spec: Dict) -> List[Dict[str, Optional[str]]]:
+        tag, class_ = spec['container']
+        soup = self.soup(content, parse_only=SoupStrainer(tag, class_=_has_class(class_)))
+
+        cards = []
+        for card in soup.find_all(tag, class_=class_):
+            fields = {}
+            for name, (field_tag, field_class, attr) in spec['fields'].items():
+                found = card.find(field_tag, class_=field_class) if field_class else card.find(field_tag)
+                if found is None:
+                    continue
+                fields[name] = found.get(attr) if attr else found.get_text(strip=True)
+            cards.append(fields)
+        return cards
+
+def _class_predicate(class_: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_} ')"
+
+class LxmlBackend(ParserBackend):
+    """Raw lxml with precompiled XPath, never building a BeautifulSoup tree for cards"""
+
+    name = 'lxml-xpath'
+
+    def __init__(self):
+        self._compiled = {}
+
+    def soup(self, content: bytes, parse_only: SoupStrainer = None) -> BeautifulSoup:
+        return BeautifulSoup(content, 'lxml', parse_only=parse_only)
+
+    def _xpaths(self, spec: Dict):
+        """Compile (and cache) the XPath expressions for a spec"""
+        key = id(spec)
+        if key not in self._compiled:
+            tag, class_ = spec['container']
+            container = etree.XPath(f"//{tag}[{_class_predicate(class_)}]")
+            fields = {}
+            for name, (field_tag, field_class, attr) in spec['fields'].items():
+                predicate = f"[{_class_predicate(field_class)}]" if field_class else ''
+                fields[name] = (etree.XPath(f"(.//{field_tag}{predicate})[1]"), attr)
+            self._compiled[key] = (container, fields)
+        return self._compiled[key]
+
+    def extract_cards(self, content: bytes, spec: Dict) -> List[Dict[str, Optional[str]]]:
+        if not content or not content.strip():
+            return []
+
+        # Decode the way BeautifulSoup would so both backends see the same text
+        try:
+            markup = content.decode('utf-8')
+        except UnicodeDecodeError:
+            markup = UnicodeDammit(content, is_html=True).unicode_markup
+
+        container, fields_xpath = self._xpaths(spec)
+        root = lxml.html.fromstring(markup)
+
+        cards = []
+        for card in container(root):
+            fields = {}
+            for name, (xpath, attr) in fields_xpath.items():
+                found = xpath(card)
+                if not found:
+                    continue
+                element = found[0]
+                fields[name] = element.get(attr) if attr else ''.join(t.strip() for t in element.itertext())
+            cards.append(fields)
+        return cards
+
+def reference_extract_cards(content: bytes, spec: Dict) -> List[Dict[str, Optional[str]]]:
+    """Original behaviour: full html.parser document, then find() per field"""
+    tag, class_ = spec['container']
+    soup = BeautifulSoup(content, 'html.parser')
+
+    cards = []
+    for card in soup.find_all(tag, class_=class_):
+        fields = {}
+        for name, (field_tag, field_class, attr) in spec['fields'].items():
+            found = card.find(field_tag, class_=field_class) if field_class else card.find(field_tag)
+            if found is not None:
+                fields[name] = found.get(attr) if attr else found.get_text(strip=True)
+        cards.append(fields)
+    return cards
+
+def available_backends() -> List[str]:
+    """Names of the backends that can be used in this environment"""
+    names = ['html.parser']
+    if LXML_AVAILABLE:
+        names += ['lxml', 'lxml-xpath']
+    return names
+
+_backends: Dict[str, ParserBackend] = {}
+
+def get_backend(name: str = HTML_PARSER_BACKEND) -> ParserBackend:
+    """Get a parser backend by name, falling back to html.parser without lxml"""
+    if name not in available_backends():
+        name = 'html.parser'
+
+    if name not in _backends:
+        _backends[name] = LxmlBackend() if name == 'lxml-xpath' else BeautifulSoupBackend(name)
+    return _backends[name]
+
+def check_parity(content: bytes, spec: Dict = LINKEDIN_CARD) -> Dict[str, List]:
+    """Compare every available backend against the reference output.
+
+    Returns a mapping of backend name to the list of (index, expected, got)
+    mismatches; an empty list means the backend is safe to switch to.
+    """
+    expected = reference_extract_cards(content, spec)
+    results = {}
+    for name in available_backends():
+        got = get_backend(name).extract_cards(content, spec)
+        mismatches = [
+            (i, want, have) for i, (want, have) in enumerate(zip(expected, got)) if want != have
+        ]
+        if len(got) != len(expected):
+            mismatches.append((min(len(got), len(expected)), len(expected), len(got)))
+        results[name] = mismatches
+    return results
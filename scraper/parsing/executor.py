@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config.settings import PARSE_WORKERS
+
+# Parse-only scraper instances, one per class, living in each worker process
+_worker_scrapers: Dict[type, Any] = {}
+
+def _call_parser(scraper_class: type, method: str, args: Tuple) -> Any:
+    """Run a scraper's parse method (executed inside a worker process)"""
+    scraper = _worker_scrapers.get(scraper_class)
+    if scraper is None:
+        scraper = _worker_scrapers[scraper_class] = scraper_class()
+    return getattr(scraper, method)(*args)
+
+class ParseExecutor:
+    """Runs the CPU-heavy parse stage of the scrapers on a process pool.
+
+    Fetchers hand over raw HTML bytes plus whatever context the parse method
+    needs; the parse method runs on a parse-only scraper instance in a worker
+    process and returns plain job dicts. With ``workers=0`` everything runs
+    inline in the calling process, which is handy for debugging.
+
+    Workers are started with forkserver (spawn where that is unavailable),
+    never fork: the pool is created on first use from a pipeline source
+    thread, and forking while other threads hold the stdout or logging locks
+    can leave a worker deadlocked.
+    """
+
+    def __init__(self, workers: Optional[int] = PARSE_WORKERS):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context(method))
+            return self._pool
+
+    def map(self, scraper_class: type, method: str, tasks: Sequence[Tuple]) -> List[Any]:
+        """Run method(*task) for every task, returning results or exceptions in order"""
+        if not tasks:
+            return []
+
+        if self.workers <= 0 or len(tasks) == 1:
+            results = []
+            for task in tasks:
+                try:
+                    results.append(_call_parser(scraper_class, method, task))
+                except Exception as e:
+                    results.append(e)
+            return results
+
+        pool = self._get_pool()
+        futures = [pool.submit(_call_parser, scraper_class, method, task) for task in tasks]
+
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def submit(self, scraper_class: type, method: str, task: Tuple) -> Future:
+        """Start method(*task) on the pool; with ``workers=0`` it runs now and the future is already done"""
+        if self.workers > 0:
+            return self._get_pool().submit(_call_parser, scraper_class, method, task)
+
+        future = Future()
+        try:
+            future.set_result(_call_parser(scraper_class, method, task))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def close(self):
+        """Shut the worker processes down"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+_shared_executor: Optional[ParseExecutor] = None
+_shared_lock = threading.Lock()
+
+def get_parse_executor() -> ParseExecutor:
+    """Get the process-wide parse executor"""
+    global _shared_executor
+    with _shared_lock:
+        if _shared_executor is None:
+            _shared_executor = ParseExecutor()
+        return _shared_executor
@@ -0,0 +1,84 @@
+from typing import Dict, List, Tuple
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+from bs4.element import PreformattedString, Script, Stylesheet
+
+JOB_KEYWORDS = ('job', 'position', 'career', 'opportunity')
+CONTAINER_TAGS = ('div', 'li', 'article')
+
+def _own_text(tag: Tag) -> List[str]:
+    """Visible strings directly inside a tag (not inside its children)"""
+    return [
+        str(child) for child in tag.children
+        if isinstance(child, NavigableString)
+        and not isinstance(child, (PreformattedString, Script, Stylesheet))
+    ]
+
+def _signature(tag: Tag) -> Tuple:
+    """What makes two sibling elements 'the same structure'"""
+    return (tag.name, tuple(sorted(tag.get('class') or ())))
+
+def find_job_containers(soup: BeautifulSoup, keywords: Tuple[str, ...] = JOB_KEYWORDS,
+                        limit: int = 20) -> List[Tag]:
+    """Find repeated job-like elements in a single bottom-up pass.
+
+    Every element's text length and keyword hit count is built from its own
+    strings plus the already computed totals of its children, so the document
+    is scanned once instead of once per ancestor. Siblings sharing a tag and
+    class list form a group; groups are ranked by how many members mention a
+    job keyword, and the best groups that do not contain (or sit inside)
+    already chosen elements are returned, so results never overlap.
+    """
+    tags = soup.find_all(True)  # document order: parents before children
+    text_len: Dict[int, int] = {}
+    hits: Dict[int, int] = {}
+
+    for tag in reversed(tags):
+        length = 0
+        count = 0
+        for text in _own_text(tag):
+            lowered = text.lower()
+            length += len(text.strip())
+            count += sum(lowered.count(keyword) for keyword in keywords)
+        for child in tag.find_all(True, recursive=False):
+            length += text_len[id(child)]
+            count += hits[id(child)]
+        text_len[id(tag)] = length
+        hits[id(tag)] = count
+
+    # Group repeated siblings and keep the members that look like jobs
+    groups = []
+    for parent in [soup] + tags:
+        by_signature: Dict[Tuple, List[Tag]] = {}
+        for child in parent.find_all(CONTAINER_TAGS, recursive=False):
+            by_signature.setdefault(_signature(child), []).append(child)
+
+        for members in by_signature.values():
+            if len(members) < 2:
+                continue
+            matching = [m for m in members if hits[id(m)] and text_len[id(m)]]
+            if len(matching) >= 2:
+                total_text = sum(text_len[id(m)] for m in matching)
+                groups.append((len(matching), -total_text, matching))
+
+    # Best groups first; more matching members wins, then the tighter (less text) group
+    groups.sort(key=lambda g: (g[0], g[1]), reverse=True)
+
+    chosen: List[Tag] = []
+    chosen_ids = set()
+    covered_ids = set()  # ancestors of chosen elements
+    for _, _, members in groups:
+        if len(chosen) >= limit:
+            break
+        if any(id(m) in covered_ids or id(m) in chosen_ids for m in members):
+            continue
+        if any(id(parent) in chosen_ids for parent in members[0].parents):
+            continue
+
+        for member in members[:limit - len(chosen)]:
+            chosen.append(member)
+            chosen_ids.add(id(member))
+        for parent in members[0].parents:
+            covered_ids.add(id(parent))
+
+    return chosen
@@ -0,0 +1,86 @@
+import re
+from typing import Dict, Optional
+
+PROVINCES = {
+    'alberta': 'AB',
+    'british columbia': 'BC',
+    'manitoba': 'MB',
+    'new brunswick': 'NB',
+    'newfoundland and labrador': 'NL',
+    'newfoundland': 'NL',
+    'nova scotia': 'NS',
+    'northwest territories': 'NT',
+    'nunavut': 'NU',
+    'ontario': 'ON',
+    'prince edward island': 'PE',
+    'quebec': 'QC',
+    'québec': 'QC',
+    'saskatchewan': 'SK',
+    'yukon': 'YT',
+}
+PROVINCE_CODES = set(PROVINCES.values())
+
+COUNTRIES = {
+    'canada': 'CA',
+    'united states': 'US',
+    'united states of america': 'US',
+    'usa': 'US',
+}
+
+# Big Canadian cities that postings often list without a province
+CITY_PROVINCES = {
+    'toronto': 'ON', 'ottawa': 'ON', 'mississauga': 'ON', 'waterloo': 'ON', 'kitchener': 'ON',
+    'markham': 'ON', 'hamilton': 'ON',
+    'montreal': 'QC', 'montréal': 'QC', 'quebec city': 'QC', 'laval': 'QC',
+    'vancouver': 'BC', 'burnaby': 'BC', 'surrey': 'BC', 'victoria': 'BC',
+    'calgary': 'AB', 'edmonton': 'AB', 'winnipeg': 'MB', 'regina': 'SK', 'saskatoon': 'SK',
+    'halifax': 'NS', 'fredericton': 'NB', 'moncton': 'NB', "st. john's": 'NL', 'charlottetown': 'PE',
+    'whitehorse': 'YT', 'yellowknife': 'NT', 'iqaluit': 'NU',
+}
+
+REMOTE_PATTERN = re.compile(r'\b(remote|work from home|wfh)\b', re.IGNORECASE)
+_QUALIFIER = re.compile(r'\((?:remote|hybrid|on-?site)\)|\b(?:remote|hybrid|on-?site)\b', re.IGNORECASE)
+_GREATER_AREA = re.compile(r'^greater (.+?)(?: metropolitan)? area$', re.IGNORECASE)
+
+def parse_location(location: Optional[str]) -> Dict:
+    """Split a free-text location into country, province_code, city and is_remote.
+
+    Handles the shapes job boards use: "Toronto, Ontario, Canada",
+    "Toronto, ON (Hybrid)", "Greater Vancouver Area", "Remote - Canada", ...
+    Anything not recognized is left as None rather than guessed.
+    """
+    parsed = {'country': None, 'province_code': None, 'city': None, 'is_remote': 0}
+    if not location or location == 'N/A':
+        return parsed
+
+    if REMOTE_PATTERN.search(location):
+        parsed['is_remote'] = 1
+
+    parts = [
+        part.strip(' -–')
+        for part in re.split(r'[,|/]| - ', _QUALIFIER.sub('', location))
+    ]
+    parts = [part for part in parts if part]
+
+    city = None
+    for part in parts:
+        lowered = part.lower()
+        if lowered in COUNTRIES:
+            parsed['country'] = COUNTRIES[lowered]
+        elif lowered in PROVINCES:
+            parsed['province_code'] = PROVINCES[lowered]
+        elif part.upper() in PROVINCE_CODES and len(part) == 2 and part.isupper():
+            parsed['province_code'] = part
+        elif city is None:
+            match = _GREATER_AREA.match(part)
+            city = match.group(1) if match else part
+
+    if city:
+        parsed['city'] = city
+        if parsed['province_code'] is None and parsed['country'] in (None, 'CA'):
+            parsed['province_code'] = CITY_PROVINCES.get(city.lower())
+
+    if parsed['province_code'] and parsed['country'] is None:
+        parsed['country'] = 'CA'
+
+    return parsed
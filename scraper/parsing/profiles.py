@@ -0,0 +1,76 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from config.settings import SELECTOR_PROFILE_MAX_AGE_DAYS
+from scraper.database.models import JobDatabase
+
+FALLBACK_CONTAINER = '*fallback*'  # no container selector matched, use the scoring extractor
+NO_MATCH = ''  # no field selector matched last time; the full chain is still probed
+
+class SelectorProfiles:
+    """Learned per-site selector profiles for custom URLs.
+
+    A profile records which job-container selector and which selector for
+    each field (title, company, ...) matched on a site, keyed by the custom
+    URL's name. Later runs try the learned selector first and only probe the
+    rest when it stops matching; the winners of each run are saved back, so
+    a site that changes its markup is re-learned automatically. Profiles
+    older than ``max_age_days`` are ignored to force a full re-probe.
+    """
+
+    def __init__(self, db: JobDatabase = None, max_age_days: int = SELECTOR_PROFILE_MAX_AGE_DAYS):
+        self.db = db
+        self.max_age = timedelta(days=max_age_days)
+        self.profiles: Dict[str, Dict] = db.get_selector_profiles() if db else {}
+
+    def get(self, source: str) -> Dict:
+        """Get the learned profile for a site, or an empty one if stale/unknown"""
+        profile = self.profiles.get(source)
+        if not profile:
+            return {}
+
+        learned_at = profile.get('learned_at')
+        if learned_at and datetime.now() - datetime.fromisoformat(learned_at) > self.max_age:
+            return {}
+        return profile
+
+    @staticmethod
+    def order(selectors: List[str], learned: Optional[str]) -> List[str]:
+        """Put the learned selector first; with no learned match the full chain is tried"""
+        if learned is None or learned == NO_MATCH:
+            return selectors
+        return [learned] + [s for s in selectors if s != learned]
+
+    def learn(self, source: str, previous: Dict, container: Optional[str],
+              usage: Dict[str, Counter]):
+        """Save this run's winning selectors if they differ from the profile used"""
+        if container is None:
+            # Nothing found at all, forget the profile so the next run probes everything
+            if source in self.profiles:
+                del self.profiles[source]
+                if self.db:
+                    self.db.delete_selector_profile(source)
+            return
+
+        # Field selectors were learned inside the old container's elements; a new container starts over
+        fields = dict(previous.get('fields', {})) if previous.get('container') == container else {}
+        for field, counts in usage.items():
+            if not counts:
+                continue
+            # "No match" is only learned when no element had the field; a field some postings
+            # lack (e.g. salary) keeps its best selector, with the full chain behind it
+            matched = Counter({selector: n for selector, n in counts.items() if selector != NO_MATCH})
+            fields[field] = matched.most_common(1)[0][0] if matched else NO_MATCH
+
+        if previous and previous.get('container') == container and previous.get('fields') == fields:
+            return
+
+        profile = {
+            'container': container,
+            'fields': fields,
+            'learned_at': datetime.now().isoformat()
+        }
+        self.profiles[source] = profile
+        if self.db:
+            self.db.save_selector_profile(source, profile)
@@ -0,0 +1,106 @@
+import hashlib
+import re
+from typing import Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+# Query parameters that only track the click on any site (ad and mail campaign IDs)
+TRACKING_PARAMS = {'gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', '_hsenc', '_hsmi'}
+TRACKING_PREFIXES = ('utm_',)
+
+# Host suffix -> parameters that only track the click there. Names like "position"
+# or "ref" can select content on other sites, so they are only dropped where known.
+SITE_TRACKING_PARAMS = {
+    'linkedin.com': {
+        'refid', 'trackingid', 'trk', 'trkinfo', 'position', 'pagenum', 'lipi', 'midtoken', 'midsig',
+        'eid', 'otptoken', 'originalsubdomain', 'ref', 'referrer', 'src',
+    },
+}
+
+# In-page anchors (#apply, #top, #job-description) name no resource of their own; any other
+# fragment, e.g. a "#/job/123" route on a single-page job board, may be the job itself
+_ANCHOR = re.compile(r'^[A-Za-z_-]*$')
+
+_LINKEDIN_JOB_PATH = re.compile(r'/jobs/view/(?:[^/]*?-)?(\d+)/?$')
+_GREENHOUSE_JOB_PATH = re.compile(r'^/([^/]+)/jobs/(\d+)')
+_LEVER_JOB_PATH = re.compile(r'^/([^/]+)/([0-9a-f-]{36})')
+
+def _linkedin(parts, params) -> Optional[Tuple[str, str]]:
+    """www/ca.linkedin.com/jobs/view/<slug>-<id> or ?currentJobId=<id>"""
+    match = _LINKEDIN_JOB_PATH.search(parts.path)
+    job_id = match.group(1) if match else dict(params).get('currentJobId')
+    if job_id and job_id.isdigit():
+        return f'https://www.linkedin.com/jobs/view/{job_id}/', f'linkedin:{job_id}'
+    return None
+
+def _greenhouse(parts, params) -> Optional[Tuple[str, str]]:
+    """boards.greenhouse.io/<company>/jobs/<id>"""
+    match = _GREENHOUSE_JOB_PATH.match(parts.path)
+    if match:
+        company, job_id = match.group(1).lower(), match.group(2)
+        return f'https://boards.greenhouse.io/{company}/jobs/{job_id}', f'greenhouse:{company}:{job_id}'
+    return None
+
+def _lever(parts, params) -> Optional[Tuple[str, str]]:
+    """jobs.lever.co/<company>/<posting uuid>"""
+    match = _LEVER_JOB_PATH.match(parts.path)
+    if match:
+        company, posting = match.group(1).lower(), match.group(2).lower()
+        return f'https://jobs.lever.co/{company}/{posting}', f'lever:{company}:{posting}'
+    return None
+
+# Host suffix -> rule returning (canonical URL, stable job key), or None to fall back to the generic rule
+SITE_RULES = {
+    'linkedin.com': _linkedin,
+    'greenhouse.io': _greenhouse,
+    'lever.co': _lever,
+}
+
+def _for_host(host: str, table: dict):
+    for suffix, value in table.items():
+        if host == suffix or host.endswith('.' + suffix):
+            return value
+    return None
+
+def _resolve(url: str, base_url: Optional[str] = None) -> Tuple[str, Optional[str]]:
+    """Canonical form of a URL and, for sites with their own job IDs, a stable key"""
+    url = (url or '').strip()
+    if base_url:
+        url = urljoin(base_url, url)
+    parts = urlsplit(url)
+    if not parts.scheme or not parts.netloc:
+        return url, None
+
+    host = (parts.hostname or '').lower()
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    rule = _for_host(host, SITE_RULES)
+    if rule:
+        resolved = rule(parts, params)
+        if resolved:
+            return resolved
+
+    netloc = host
+    if parts.port and (parts.scheme, parts.port) not in (('http', 80), ('https', 443)):
+        netloc += f':{parts.port}'
+    tracking = TRACKING_PARAMS | (_for_host(host, SITE_TRACKING_PARAMS) or set())
+    kept = sorted(
+        (key, value) for key, value in params
+        if key.lower() not in tracking and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    # Sites with their own rules don't route by fragment; elsewhere only plain anchors are dropped
+    fragment = '' if rule or _ANCHOR.match(parts.fragment) else parts.fragment
+    return urlunsplit((parts.scheme.lower(), netloc, parts.path or '/', urlencode(kept), fragment)), None
+
+def canonicalize_url(url: str, base_url: Optional[str] = None) -> str:
+    """The stable form of a job URL: relative links resolved against base_url,
+    tracking parameters and in-page anchors dropped, site job links rewritten to one shape"""
+    return _resolve(url, base_url)[0]
+
+def job_key(url: str) -> Optional[str]:
+    """The site's own ID for a job link, e.g. "linkedin:3912345678", if it has one"""
+    return _resolve(url)[1]
+
+def job_identity(title: str, company: str, url: str) -> str:
+    """Stable job ID: the site's job ID when the URL has one, else title, company and canonical URL"""
+    canonical, key = _resolve(url)
+    content = key or f"{title}_{company}_{canonical}"
+    return hashlib.md5(content.encode()).hexdigest()
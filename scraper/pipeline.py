@@ -0,0 +1,228 @@
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from config.settings import INGEST_BATCH_SIZE, PIPELINE_FLUSH_SECONDS, PIPELINE_QUEUE_SIZE
+from scraper.database.models import JobDatabase
+from scraper.filtering.job_filter import JobFilter
+
+_DONE = object()  # end-of-stream marker passed down the queues
+
+class _Stream:
+    """A stage's input queue, which ends after the end-of-stream marker of each producer"""
+
+    def __init__(self, inbox: queue.Queue, producers: int = 1):
+        self.inbox = inbox
+        self.remaining = producers
+
+    def get(self, timeout: Optional[float] = None):
+        """Next item, or _DONE once every producer has finished (queue.Empty on timeout)"""
+        while self.remaining:
+            item = self.inbox.get(timeout=timeout)
+            if item is not _DONE:
+                return item
+            self.remaining -= 1
+        return _DONE
+
+    def __iter__(self) -> Iterator[Dict]:
+        while True:
+            item = self.get()
+            if item is _DONE:
+                return
+            yield item
+
+class JobPipeline:
+    """Streams scraped jobs through bounded queues into SQLite and the notifier.
+
+    Every source runs its scraper generator (which fetches and parses lazily)
+    in its own thread, so a slow site never holds up the others. Jobs then flow
+    through one thread per stage: filter -> dedupe -> batch-store -> notify.
+    The queues between stages are bounded, so when storing falls behind the
+    scrapers block instead of piling jobs up in memory. The store stage writes
+    a batch when it is full or PIPELINE_FLUSH_SECONDS after its first job,
+    whichever comes first, so jobs reach the database seconds after they are
+    fetched. The notify stage collects new, non-duplicate jobs and hands them
+    to ``notify`` once every source has finished, as a single digest.
+
+    A source's ``commit`` callback runs after the pipeline has drained, and only
+    if the source finished and every batch was stored: that is when a scraper
+    may remember what it has seen (HTTP validators, watermarks), since a run
+    that lost jobs must fetch them again next time.
+    """
+
+    def __init__(self, db: JobDatabase, job_filter: JobFilter = None,
+                 notify: Optional[Callable[[List[Dict]], None]] = None,
+                 queue_size: int = PIPELINE_QUEUE_SIZE, batch_size: int = INGEST_BATCH_SIZE,
+                 flush_seconds: float = PIPELINE_FLUSH_SECONDS, logger: logging.Logger = None):
+        self.db = db
+        self.job_filter = job_filter or JobFilter()
+        self.notify = notify
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.logger = logger or logging.getLogger(__name__)
+        self.sources: Dict[str, Callable[[], Iterable[Dict]]] = {}
+        self.commits: Dict[str, Callable[[], None]] = {}
+
+        self.new_jobs: List[Dict] = []
+        self.errors: List[Exception] = []
+        self.failed_sources = set()
+        self.store_failed = False
+        self.counts = {key: Counter() for key in ('scraped', 'new', 'duplicates')}
+
+    def add_source(self, name: str, scrape: Callable[[], Iterable[Dict]],
+                   commit: Optional[Callable[[], None]] = None):
+        """Register a source; ``scrape`` is called in the source's thread and may yield jobs lazily,
+        ``commit`` once its jobs are safely stored"""
+        self.sources[name] = scrape
+        if commit:
+            self.commits[name] = commit
+
+    def run(self) -> List[Dict]:
+        """Run every source through the pipeline and return the new jobs.
+
+        A stage that fails still ends its output stream and drains its input,
+        so the other stages and the source threads always finish; its error
+        is raised here once every thread has been joined, and nothing is
+        committed.
+        """
+        scraped, filtered, unseen, stored = (queue.Queue(self.queue_size) for _ in range(4))
+        self.errors, self.failed_sources, self.store_failed = [], set(), False
+        self.db.seen_index  # load before the stages share it
+
+        threads = [
+            threading.Thread(target=self._scrape, args=(name, scrape, scraped),
+                             name=f'pipeline-{name}', daemon=True)
+            for name, scrape in self.sources.items()
+        ]
+        stages = [
+            ('filter', self._filter, _Stream(scraped, len(self.sources)), filtered),
+            ('dedupe', self._dedupe, _Stream(filtered), unseen),
+            ('store', self._store, _Stream(unseen), stored),
+            ('notify', self._notify, _Stream(stored), None),
+        ]
+        threads += [
+            threading.Thread(target=self._stage, args=(name, stage, inbox, outbox),
+                             name=f'pipeline-{name}', daemon=True)
+            for name, stage, inbox, outbox in stages
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self.errors:
+            raise self.errors[0]
+        self._commit()
+        return self.new_jobs
+
+    def _commit(self):
+        """Let every source that finished cleanly remember this run, if all its jobs were stored"""
+        if self.store_failed:
+            self.logger.warning("Some jobs could not be stored; sources will fetch them again next run")
+            return
+        for name, commit in self.commits.items():
+            if name in self.failed_sources:
+                continue
+            try:
+                commit()
+            except Exception as e:
+                self.logger.error(f"Error committing {name}: {e}")
+
+    def _stage(self, name: str, stage: Callable, inbox: _Stream, outbox: Optional[queue.Queue]):
+        """Run one stage, always ending its output and draining its input, even when it fails"""
+        try:
+            if outbox is None:
+                stage(inbox)
+            else:
+                stage(inbox, outbox)
+        except Exception as e:
+            self.logger.error(f"Pipeline {name} stage failed: {e}")
+            self.errors.append(e)
+        finally:
+            if outbox is not None:
+                outbox.put(_DONE)
+            for _ in inbox:
+                pass  # unblock upstream threads waiting on a full queue
+
+    def _scrape(self, name: str, scrape: Callable[[], Iterable[Dict]], outbox: queue.Queue):
+        """Fetch + parse stage of one source"""
+        self.logger.info(f"Scraping {name}...")
+        try:
+            for job in scrape():
+                self.counts['scraped'][job.get('source', name)] += 1
+                outbox.put(job)
+        except Exception as e:
+            self.logger.error(f"Error scraping {name}: {e}")
+            self.failed_sources.add(name)
+        finally:
+            outbox.put(_DONE)
+
+    def _filter(self, inbox: _Stream, outbox: queue.Queue):
+        """Drop jobs the filters block rejects; ends once every source has finished"""
+        for job in self.job_filter.apply(inbox):
+            outbox.put(job)
+
+    def _dedupe(self, inbox: _Stream, outbox: queue.Queue):
+        """Drop jobs stored by earlier runs before they reach SQLite"""
+        seen = self.db.seen_index
+        for job in inbox:
+            if job['job_id'] not in seen:
+                outbox.put(job)
+
+    def _store(self, inbox: _Stream, outbox: queue.Queue):
+        """Write jobs in batches, one transaction each, as soon as a batch is full or old enough"""
+        batch: List[Dict] = []
+        deadline = None
+        while True:
+            try:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                item = inbox.get(timeout=timeout)
+            except queue.Empty:
+                item = None  # batch is old enough: write what we have
+
+            if item is not None and item is not _DONE:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_seconds
+                if len(batch) < self.batch_size:
+                    continue
+
+            if batch:
+                self._write(batch, outbox)
+                batch, deadline = [], None
+            if item is _DONE:
+                return
+
+    def _write(self, batch: List[Dict], outbox: queue.Queue):
+        try:
+            new_ids = set(self.db.store_jobs(batch))
+        except Exception as e:
+            self.logger.error(f"Error storing {len(batch)} jobs: {e}")
+            self.store_failed = True
+            return
+
+        for job in batch:
+            if job['job_id'] in new_ids:
+                new_ids.discard(job['job_id'])  # Same job twice in a batch is only new once
+                if job.get('duplicate_of'):
+                    self.counts['duplicates'][job.get('source')] += 1  # Already announced under another URL or source
+                else:
+                    self.counts['new'][job.get('source')] += 1
+                    outbox.put(job)
+
+    def _notify(self, inbox: _Stream):
+        """Collect new jobs and send one notification when the stream ends"""
+        self.new_jobs.extend(inbox)
+        if self.notify:
+            try:
+                self.notify(self.new_jobs)
+            except Exception as e:
+                self.logger.error(f"Error sending notifications: {e}")
+
+    def stats(self) -> Dict:
+        """Per-source job counts of the last run"""
+        return {key: dict(counts) for key, counts in self.counts.items()}
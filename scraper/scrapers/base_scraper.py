@@ -1,42 +1,95 @@
+import queue
+import threading
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import Any, List, Dict, Iterable, Iterator, Sequence, Tuple, Union
 import requests
-import time
-import random
-from config.settings import USER_AGENTS, REQUEST_DELAY
+from config.settings import MAX_RETRIES
+from scraper.fetching.fetcher import AsyncFetcher
+from scraper.parsing.backends import get_backend
+from scraper.parsing.executor import get_parse_executor
+from scraper.parsing.urls import job_identity
 
 class BaseScraper(ABC):
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': random.choice(USER_AGENTS)
-        })
+        self._fetcher = None
+        self.parser = get_backend()
     
-    def make_request(self, url: str, retries: int = 3) -> requests.Response:
+    @property
+    def fetcher(self) -> AsyncFetcher:
+        """Fetch engine, created on first use so parse-only instances stay cheap"""
+        if self._fetcher is None:
+            self._fetcher = AsyncFetcher()
+        return self._fetcher
+    
+    @fetcher.setter
+    def fetcher(self, fetcher: AsyncFetcher):
+        self._fetcher = fetcher
+    
+    def make_request(self, url: str, retries: int = MAX_RETRIES) -> requests.Response:
         """Make a request with retry logic and delays"""
-        for attempt in range(retries):
+        return self.fetcher.fetch_sync(url, retries)
+    
+    def fetch_many(self, urls: List[str]) -> List[Union[requests.Response, Exception]]:
+        """Fetch several URLs concurrently, returning responses or exceptions in order"""
+        return self.fetcher.fetch_many(urls)
+    
+    def parse_many(self, method: str, tasks: Sequence[Tuple]) -> List[Any]:
+        """Run a parse method over raw pages on the parse executor, returning results or exceptions in order"""
+        return get_parse_executor().map(type(self), method, tasks)
+    
+    def fetch_and_parse(self, method: str, urls: List[str],
+                        tasks: Sequence[Tuple]) -> Iterator[Tuple[int, Union[requests.Response, Exception], Any]]:
+        """Fetch URLs concurrently and parse each page as soon as it arrives.
+        
+        Yields (index, response, result) in the order pages finish, so one slow
+        or retrying URL only holds back its own jobs. The page content is
+        passed to the parse method ahead of ``tasks[index]``. ``result`` is the
+        parse result or exception, or None when the fetch failed (``response``
+        is then the exception) or the page was not modified.
+        """
+        done = queue.Queue()
+        executor = get_parse_executor()
+        
+        def on_response(index, response):
+            # Runs on the fetch loop: hand the page to the parse executor and move on
+            if isinstance(response, Exception) or self.is_not_modified(response):
+                done.put((index, response, None))
+                return
             try:
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
-                
-                # Add delay between requests
-                time.sleep(random.uniform(REQUEST_DELAY, REQUEST_DELAY + 2))
-                
-                return response
-            except requests.RequestException as e:
-                if attempt == retries - 1:
-                    raise e
-                time.sleep(2 ** attempt)  # Exponential backoff
+                future = executor.submit(type(self), method, (response.content,) + tuple(tasks[index]))
+            except Exception as e:
+                done.put((index, response, e))
+                return
+            future.add_done_callback(
+                lambda future: done.put((index, response, future.exception() or future.result()))
+            )
         
-        raise requests.RequestException("Max retries exceeded")
+        fetching = threading.Thread(target=self.fetcher.fetch_each, args=(urls, on_response),
+                                    name='fetch-and-parse', daemon=True)
+        fetching.start()
+        for _ in urls:
+            yield done.get()
+        fetching.join()
+    
+    def is_not_modified(self, response: requests.Response) -> bool:
+        """Check whether a conditional request found the page unchanged (no new jobs)"""
+        return response.status_code == 304
+    
+    def discard_fetch(self, url: str):
+        """Forget a fetched page's validators, e.g. because it could not be parsed"""
+        if self.fetcher.cache:
+            self.fetcher.cache.discard(url)
+    
+    def commit(self):
+        """Called once the jobs of the last scrape_jobs run are stored: keep its fetch validators"""
+        if self.fetcher.cache:
+            self.fetcher.cache.commit()
     
     @abstractmethod
-    def scrape_jobs(self, search_params: Dict) -> List[Dict]:
+    def scrape_jobs(self, search_params: Dict) -> Iterable[Dict]:
         """Scrape jobs from the source"""
         pass
     
     def generate_job_id(self, title: str, company: str, url: str) -> str:
-        """Generate a unique job ID"""
-        import hashlib
-        content = f"{title}_{company}_{url}"
-        return hashlib.md5(content.encode()).hexdigest() 
\ No newline at end of file
+        """Generate a stable job ID (see scraper.parsing.urls.job_identity)"""
+        return job_identity(title, company, url)
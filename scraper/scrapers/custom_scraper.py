@@ -1,98 +1,175 @@
 from .base_scraper import BaseScraper
 from bs4 import BeautifulSoup
 import re
-from typing import List, Dict
+from collections import Counter
+from typing import List, Dict, Iterator, Optional, Tuple
 from datetime import datetime
+from config.settings import INCREMENTAL_SCRAPING
+from scraper.database.models import JobDatabase
+from scraper.parsing.extractor import find_job_containers
+from scraper.parsing.profiles import SelectorProfiles, FALLBACK_CONTAINER, NO_MATCH
+from scraper.parsing.urls import canonicalize_url
+from .watermarks import Watermarks
 
 class CustomScraper(BaseScraper):
-    def __init__(self):
+    # Common selectors for job listings, tried in order
+    JOB_ELEMENT_SELECTORS = [
+        'div[class*="job"]',
+        'div[class*="position"]',
+        'div[class*="career"]',
+        'li[class*="job"]',
+        'article[class*="job"]',
+        '.job-listing',
+        '.position-listing',
+        '.career-listing'
+    ]
+    
+    # Selectors for each field inside a job element, tried in order
+    FIELD_SELECTORS = {
+        'title': [
+            'h1', 'h2', 'h3', 'h4',
+            '[class*="title"]',
+            '[class*="position"]',
+            '[class*="job-title"]'
+        ],
+        'company': [
+            '[class*="company"]',
+            '[class*="employer"]',
+            '[class*="organization"]'
+        ],
+        'location': [
+            '[class*="location"]',
+            '[class*="place"]',
+            '[class*="city"]'
+        ],
+        'salary': [
+            '[class*="salary"]',
+            '[class*="compensation"]',
+            '[class*="pay"]'
+        ]
+    }
+    
+    def __init__(self, db: JobDatabase = None, incremental: bool = INCREMENTAL_SCRAPING):
         super().__init__()
+        self.db = db
+        self.incremental = incremental
+        self.profiles = SelectorProfiles(db)
+        self.watermarks = None
     
-    def scrape_jobs(self, custom_urls: List[Dict]) -> List[Dict]:
-        jobs = []
+    def scrape_jobs(self, custom_urls: List[Dict]) -> Iterator[Dict]:
+        """Lazily yield the jobs of every enabled custom URL, site by site as each one is ready"""
+        enabled_configs = [c for c in custom_urls if c.get('enabled', True)]
+        profiles = [self.profiles.get(c['name']) for c in enabled_configs]
+        # Career pages can't be asked for "posted since", so only an unchanged page is skipped
+        watermarks = self.watermarks = Watermarks(self.db, 'custom', enabled=self.incremental)
+        
+        # All sites are fetched concurrently and each page is parsed as soon as it arrives,
+        # so a slow or retrying site only delays its own jobs
+        pages = self.fetch_and_parse('parse_page', [c['url'] for c in enabled_configs],
+                                     list(zip(enabled_configs, profiles)))
         
-        for url_config in custom_urls:
-            if not url_config.get('enabled', True):
+        for index, response, result in pages:
+            url_config, profile = enabled_configs[index], profiles[index]
+            if isinstance(response, Exception):
+                print(f"Error scraping custom URL {url_config['name']}: {response}")
+                watermarks.fail(url_config['name'])
+                continue
+            if result is None:  # 304: unchanged, nothing new to parse
                 continue
-                
-            try:
-                response = self.make_request(url_config['url'])
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Try different selectors for job listings
-                job_elements = self._find_job_elements(soup, url_config['name'])
-                
-                for element in job_elements[:10]:  # Limit to 10 jobs per custom URL
-                    job = self._parse_job_element(element, url_config)
-                    if job:
-                        jobs.append(job)
-                        
-            except Exception as e:
-                print(f"Error scraping custom URL {url_config['name']}: {e}")
+            if isinstance(result, Exception):
+                print(f"Error scraping custom URL {url_config['name']}: {result}")
+                self.discard_fetch(url_config['url'])
+                watermarks.fail(url_config['name'])
+                continue
+            
+            page_jobs, container, usage = result
+            self.profiles.learn(url_config['name'], profile, container, usage)
+            
+            # Same jobs as last run (the page only changed around them): nothing new
+            unchanged = watermarks.unchanged(url_config['name'], page_jobs)
+            watermarks.observe(url_config['name'], page_jobs, first_page=True)
+            if not unchanged:
+                yield from page_jobs
+    
+    def commit(self):
+        """Once the jobs are stored, keep the fetch validators and the page fingerprints"""
+        super().commit()
+        if self.watermarks:
+            self.watermarks.save()
+            self.watermarks = None
+    
+    def parse_page(self, content: bytes, url_config: Dict, profile: Dict) -> Tuple[List[Dict], Optional[str], Dict[str, Counter]]:
+        """Parse a raw custom page, returning its jobs plus the selectors that matched"""
+        soup = self.parser.soup(content)
         
-        return jobs
+        # Try the learned selector for job listings first, then the common ones
+        job_elements, container = self._find_job_elements(
+            soup, url_config['name'], profile.get('container')
+        )
+        
+        # Learned field selectors go first; usage records which ones matched
+        field_selectors = {
+            field: self.profiles.order(selectors, profile.get('fields', {}).get(field))
+            for field, selectors in self.FIELD_SELECTORS.items()
+        }
+        usage = {field: Counter() for field in self.FIELD_SELECTORS}
+        
+        jobs = []
+        for element in job_elements[:10]:  # Limit to 10 jobs per custom URL
+            job = self._parse_job_element(element, url_config, field_selectors, usage)
+            if job:
+                jobs.append(job)
+        
+        return jobs, container, usage
     
-    def _find_job_elements(self, soup: BeautifulSoup, source_name: str) -> List:
-        """Find job elements using common selectors"""
-        selectors = [
-            'div[class*="job"]',
-            'div[class*="position"]',
-            'div[class*="career"]',
-            'li[class*="job"]',
-            'article[class*="job"]',
-            '.job-listing',
-            '.position-listing',
-            '.career-listing'
-        ]
+    def _find_job_elements(self, soup: BeautifulSoup, source_name: str,
+                           learned: str = None) -> Tuple[List, Optional[str]]:
+        """Find job elements using common selectors, returning them with the selector that matched"""
+        if learned == FALLBACK_CONTAINER:
+            elements = find_job_containers(soup, limit=20)
+            if elements:
+                return elements, FALLBACK_CONTAINER
+        elif learned:
+            elements = soup.select(learned)
+            if elements:
+                return elements, learned
         
-        for selector in selectors:
+        # Learned selector missing or stopped matching: probe everything again
+        for selector in self.JOB_ELEMENT_SELECTORS:
             elements = soup.select(selector)
             if elements:
-                return elements
-        
-        # Fallback: look for elements containing job-related text
-        job_elements = []
-        for element in soup.find_all(['div', 'li', 'article']):
-            text = element.get_text().lower()
-            if any(keyword in text for keyword in ['job', 'position', 'career', 'opportunity']):
-                job_elements.append(element)
+                return elements, selector
         
-        return job_elements[:20]  # Limit results
+        # Fallback: repeated elements containing job-related text
+        elements = find_job_containers(soup, limit=20)
+        return elements, (FALLBACK_CONTAINER if elements else None)
     
-    def _parse_job_element(self, element, url_config: Dict) -> Dict:
+    def _parse_job_element(self, element, url_config: Dict,
+                           field_selectors: Dict[str, List[str]] = None,
+                           usage: Dict[str, Counter] = None) -> Dict:
         """Parse individual job element"""
+        field_selectors = field_selectors or self.FIELD_SELECTORS
+        usage = usage if usage is not None else {}
+        
         try:
             # Extract job title
-            title = self._extract_text(element, [
-                'h1', 'h2', 'h3', 'h4',
-                '[class*="title"]',
-                '[class*="position"]',
-                '[class*="job-title"]'
-            ])
+            title = self._extract_text(element, field_selectors['title'], usage.get('title'))
             
             # Extract company name
-            company = self._extract_text(element, [
-                '[class*="company"]',
-                '[class*="employer"]',
-                '[class*="organization"]'
-            ]) or url_config.get('company', 'N/A')
+            company = self._extract_text(
+                element, field_selectors['company'], usage.get('company')
+            ) or url_config.get('company', 'N/A')
             
             # Extract location
-            location = self._extract_text(element, [
-                '[class*="location"]',
-                '[class*="place"]',
-                '[class*="city"]'
-            ]) or "N/A"
+            location = self._extract_text(
+                element, field_selectors['location'], usage.get('location')
+            ) or "N/A"
             
             # Extract job URL
             url = self._extract_url(element, url_config['url'])
             
             # Extract salary if available
-            salary_text = self._extract_text(element, [
-                '[class*="salary"]',
-                '[class*="compensation"]',
-                '[class*="pay"]'
-            ])
+            salary_text = self._extract_text(element, field_selectors['salary'], usage.get('salary'))
             salary_min, salary_max = self._extract_salary(salary_text)
             
             # Generate job ID
@@ -117,30 +194,29 @@ class CustomScraper(BaseScraper):
             print(f"Error parsing custom job element: {e}")
             return None
     
-    def _extract_text(self, element, selectors: List[str]) -> str:
-        """Extract text using multiple selectors"""
+    def _extract_text(self, element, selectors: List[str], usage: Counter = None) -> str:
+        """Extract text using multiple selectors, counting which one matched"""
         for selector in selectors:
             found = element.select_one(selector)
             if found:
                 text = found.get_text(strip=True)
                 if text:
+                    if usage is not None:
+                        usage[selector] += 1
                     return text
+        
+        if usage is not None:
+            usage[NO_MATCH] += 1
         return "N/A"
     
     def _extract_url(self, element, base_url: str) -> str:
-        """Extract job URL"""
+        """Extract job URL, resolved against the page and canonicalized"""
         # Look for links
         link = element.find('a')
         if link and link.get('href'):
-            href = link.get('href')
-            if href.startswith('http'):
-                return href
-            elif href.startswith('/'):
-                return base_url.rstrip('/') + href
-            else:
-                return f"{base_url}/{href}"
+            return canonicalize_url(link.get('href'), base_url)
         
-        return base_url
+        return canonicalize_url(base_url)
     
     def _extract_salary(self, salary_text: str) -> tuple:
         """Extract salary range from text"""
@@ -1,77 +1,145 @@
 from .base_scraper import BaseScraper
-from bs4 import BeautifulSoup
 import re
-from typing import List, Dict
+from typing import List, Dict, Iterator
 import json
-from datetime import datetime
+import math
+from datetime import datetime, timedelta
+from config.settings import INCREMENTAL_SCRAPING, LINKEDIN_PAGE_SIZE, LINKEDIN_PAGE_BUDGET
+from scraper.database.models import JobDatabase
+from scraper.parsing.backends import LINKEDIN_CARD
+from scraper.parsing.urls import canonicalize_url
+from .query_planner import QueryPlanner
+from .watermarks import Watermarks
 
 class LinkedInScraper(BaseScraper):
-    def __init__(self):
+    # LinkedIn's f_E codes for the experience levels accepted in job_sources.yaml
+    EXPERIENCE_LEVELS = {
+        'internship': '1',
+        'entry level': '2',
+        'associate': '3',
+        'mid-senior level': '4',
+        'director': '5',
+        'executive': '6'
+    }
+    
+    def __init__(self, db: JobDatabase = None, incremental: bool = INCREMENTAL_SCRAPING):
         super().__init__()
         self.base_url = "https://www.linkedin.com/jobs/search"
+        self.db = db
+        self.incremental = incremental
+        self.planner = QueryPlanner(db)
+        self.watermarks = None
     
-    def scrape_jobs(self, search_params: Dict) -> List[Dict]:
-        jobs = []
+    def scrape_jobs(self, search_params: Dict) -> Iterator[Dict]:
+        """Lazily yield jobs, walking result pages until they only contain known jobs"""
+        budget = search_params.get('page_budget', LINKEDIN_PAGE_BUDGET)
+        queries = self.planner.plan(search_params)
+        watermarks = self.watermarks = Watermarks(self.db, 'linkedin', enabled=self.incremental)
+        seen_this_run = set()
         
-        keywords = search_params.get('keywords', [])
-        location = search_params.get('location', 'Canada')
+        # Each round fetches the next page of every query still worth paging, concurrently
+        queue = [(query, 0) for query in queries]
         
-        for keyword in keywords:
-            url = self._build_search_url(keyword, location, search_params)
-            
-            try:
-                response = self.make_request(url)
-                soup = BeautifulSoup(response.content, 'html.parser')
+        try:
+            while queue and budget > 0:
+                batch, queue = queue[:budget], queue[budget:]
+                budget -= len(batch)
                 
-                # Find job listings
-                job_cards = soup.find_all('div', class_='base-card')
+                # Fetch stage: raw pages for the whole batch, concurrently
+                urls = [self._build_search_url(query, page, watermarks.window(query['key'])) for query, page in batch]
+                responses = self.fetch_many(urls)
                 
-                for card in job_cards[:20]:  # Limit to 20 jobs per search
-                    job = self._parse_job_card(card, keyword)
-                    if job:
-                        jobs.append(job)
-                        
-            except Exception as e:
-                print(f"Error scraping LinkedIn for {keyword}: {e}")
+                pages = []
+                for (query, page), url, response in zip(batch, urls, responses):
+                    if isinstance(response, Exception):
+                        print(f"Error scraping LinkedIn for {query['key']} (page {page + 1}): {response}")
+                        watermarks.fail(query['key'])
+                    elif not self.is_not_modified(response):  # 304: unchanged, nothing new to parse
+                        pages.append((query, page, url, response.content))
+                
+                # Parse stage: pages are turned into job dicts on the parse executor
+                results = self.parse_many('parse_page', [(content, query['keyword']) for query, _, _, content in pages])
+                
+                for (query, page, url, _), jobs in zip(pages, results):
+                    if isinstance(jobs, Exception):
+                        print(f"Error parsing LinkedIn page for {query['key']} (page {page + 1}): {jobs}")
+                        self.discard_fetch(url)
+                        watermarks.fail(query['key'])
+                        continue
+                    
+                    # Check before yielding, since the consumer stores jobs as they arrive
+                    unknown = [job for job in jobs if not self._is_known(job['job_id'])]
+                    marginal = [job for job in jobs if job['job_id'] not in seen_this_run]
+                    seen_this_run.update(job['job_id'] for job in jobs)
+                    self.planner.record_page(query, len(jobs), len(marginal), len(unknown))
+                    
+                    # Same first page as last run: nothing was posted since
+                    if page == 0 and watermarks.unchanged(query['key'], jobs):
+                        watermarks.observe(query['key'], jobs, first_page=True)
+                        continue
+                    reached = watermarks.reached(query['key'], jobs)
+                    watermarks.observe(query['key'], jobs, first_page=page == 0)
+                    
+                    yield from jobs
+                    
+                    # Results are newest first, so past the watermark every later page is older
+                    if jobs and unknown and not reached and page + 1 < query['max_pages']:
+                        queue.append((query, page + 1))
+        finally:
+            self.planner.finish_run()
+            # Out of page budget: the pages these queries still had are not covered by this run
+            for query, _ in queue:
+                watermarks.fail(query['key'])
+    
+    def commit(self):
+        """Once the jobs are stored, keep the fetch validators and move the watermarks forward"""
+        super().commit()
+        if self.watermarks:
+            self.watermarks.save()
+            self.watermarks = None
+    
+    def parse_page(self, content: bytes, keyword: str) -> List[Dict]:
+        """Parse all job cards on a raw search results page"""
+        jobs = []
+        for card in self.parser.extract_cards(content, LINKEDIN_CARD):
+            job = self._parse_job_card(card, keyword)
+            if job:
+                jobs.append(job)
         
         return jobs
     
-    def _build_search_url(self, keyword: str, location: str, params: Dict) -> str:
-        """Build LinkedIn search URL"""
+    def _is_known(self, job_id: str) -> bool:
+        """Check whether a job was stored by a previous run"""
+        return self.db is not None and job_id in self.db.seen_index
+    
+    def _build_search_url(self, query: Dict, page: int = 0, window: timedelta = None) -> str:
+        """Build LinkedIn search URL, limited to postings within ``window`` if given"""
+        level = str(query['experience_level'])
         base_params = {
-            'keywords': keyword,
-            'location': location,
-            'f_E': params.get('experience_level', '1'),  # Entry level
+            'keywords': query['keyword'],
+            'location': query['location'],
+            'f_E': self.EXPERIENCE_LEVELS.get(level.lower(), level),
             'f_JT': 'I',  # Internship
             'f_WT': '1,2',  # On-site and Remote
-            'start': 0
+            'start': page * LINKEDIN_PAGE_SIZE
         }
+        if window is not None:
+            # Whole days, so the URL (and its cached ETag) stays the same within a day
+            base_params['f_TPR'] = f"r{math.ceil(window.total_seconds() / 86400) * 86400}"
+            base_params['sortBy'] = 'DD'  # Newest first, so paging can stop at the watermark
         
         query_string = '&'.join([f"{k}={v}" for k, v in base_params.items()])
         return f"{self.base_url}?{query_string}"
     
-    def _parse_job_card(self, card, keyword: str) -> Dict:
-        """Parse individual job card"""
+    def _parse_job_card(self, card: Dict, keyword: str) -> Dict:
+        """Parse the fields extracted from an individual job card"""
         try:
-            # Extract job title
-            title_elem = card.find('h3', class_='base-search-card__title')
-            title = title_elem.get_text(strip=True) if title_elem else "N/A"
-            
-            # Extract company name
-            company_elem = card.find('h4', class_='base-search-card__subtitle')
-            company = company_elem.get_text(strip=True) if company_elem else "N/A"
-            
-            # Extract location
-            location_elem = card.find('span', class_='job-search-card__location')
-            location = location_elem.get_text(strip=True) if location_elem else "N/A"
-            
-            # Extract job URL
-            link_elem = card.find('a', class_='base-card__full-link')
-            url = link_elem.get('href') if link_elem else ""
-            
-            # Extract posted date
-            date_elem = card.find('time')
-            posted_date = date_elem.get('datetime') if date_elem else ""
+            title = card.get('title', "N/A")
+            company = card.get('company', "N/A")
+            location = card.get('location', "N/A")
+            # Card links carry per-request tracking parameters; keep only the job's own URL
+            url = canonicalize_url(card.get('url', ""), self.base_url)
+            posted_date = card.get('posted_date', "")
             
             # Generate job ID
             job_id = self.generate_job_id(title, company, url)
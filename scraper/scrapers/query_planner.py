@@ -0,0 +1,116 @@
+from itertools import product
+from typing import Dict, List, Optional
+
+from config.settings import (
+    LINKEDIN_MAX_PAGES, QUERY_PLANNER_WINDOW, QUERY_PLANNER_MIN_RUNS,
+    QUERY_PLANNER_SKIP_RATIO, QUERY_PLANNER_DOWNWEIGHT_RATIO, QUERY_PLANNER_PROBE_EVERY
+)
+from scraper.database.models import JobDatabase
+
+def _as_list(value) -> List:
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+class QueryPlanner:
+    """Plans which search queries to run, based on how much they add.
+
+    Queries are the keyword x location x experience-level matrix from the
+    search params. Every run records, per query, how many cards it returned
+    and how many of those no earlier query in the run had already returned
+    (its marginal yield). Queries are run best-first, so a query that keeps
+    returning results already covered by better ones is first limited to its
+    first page and then skipped, with an occasional probe run so that it can
+    come back if its results change.
+    """
+
+    def __init__(self, db: JobDatabase, window: int = QUERY_PLANNER_WINDOW,
+                 min_runs: int = QUERY_PLANNER_MIN_RUNS,
+                 skip_ratio: float = QUERY_PLANNER_SKIP_RATIO,
+                 downweight_ratio: float = QUERY_PLANNER_DOWNWEIGHT_RATIO,
+                 probe_every: int = QUERY_PLANNER_PROBE_EVERY):
+        self.db = db
+        self.window = window
+        self.min_runs = min_runs
+        self.skip_ratio = skip_ratio
+        self.downweight_ratio = downweight_ratio
+        self.probe_every = probe_every
+        self.run_stats: Dict[str, Dict] = {}
+
+    @staticmethod
+    def expand(search_params: Dict) -> List[Dict]:
+        """Expand search params into the keyword x location x experience-level matrix"""
+        keywords = _as_list(search_params.get('keywords'))
+        locations = _as_list(search_params.get('locations') or search_params.get('location', 'Canada'))
+        levels = _as_list(search_params.get('experience_levels') or search_params.get('experience_level', '1'))
+
+        queries = []
+        for keyword, location, level in product(keywords, locations, levels):
+            queries.append({
+                'key': f"{keyword}|{location}|{level}",
+                'keyword': keyword,
+                'location': location,
+                'experience_level': level
+            })
+        return queries
+
+    def marginal_ratio(self, runs: List[Dict]) -> Optional[float]:
+        """Share of a query's recent results that no better query returned (None until there is evidence)"""
+        # A run that returned nothing says nothing about overlap; with short posted-since
+        # windows empty runs are normal, and counting them would skip niche queries
+        ran = [run for run in runs if not run['skipped'] and run['fetched']][:self.window]
+        if not ran or len(ran) < self.min_runs:
+            return None
+
+        return sum(run['marginal'] for run in ran) / sum(run['fetched'] for run in ran)
+
+    def plan(self, search_params: Dict) -> List[Dict]:
+        """Get the queries to run this time, best first, each with its own page limit"""
+        max_pages = search_params.get('max_pages', LINKEDIN_MAX_PAGES)
+        # Enough rows to see `window` real runs past a full streak of skips
+        history = self.db.get_query_history(self.window + self.probe_every) if self.db else {}
+        self.run_stats = {}
+
+        planned = []
+        for query in self.expand(search_params):
+            runs = history.get(query['key'], [])
+            ratio = self.marginal_ratio(runs)
+
+            # Skipped for the last probe_every runs in a row: run it once more
+            probing = len(runs) >= self.probe_every and all(
+                run['skipped'] for run in runs[:self.probe_every]
+            )
+
+            if ratio is not None and ratio < self.skip_ratio and not probing:
+                self.run_stats[query['key']] = self._empty_stats(query['key'], skipped=True)
+                continue
+
+            query = dict(query)
+            query['score'] = 1.0 if ratio is None else ratio
+            query['max_pages'] = 1 if ratio is not None and ratio < self.downweight_ratio else max_pages
+            self.run_stats[query['key']] = self._empty_stats(query['key'])
+            planned.append(query)
+
+        # Stable sort keeps the configured keyword order between equally good queries
+        planned.sort(key=lambda q: q['score'], reverse=True)
+        return planned
+
+    def record_page(self, query: Dict, fetched: int, marginal: int, new: int):
+        """Add one fetched results page to the query's stats for this run"""
+        stats = self.run_stats.setdefault(query['key'], self._empty_stats(query['key']))
+        stats['pages'] += 1
+        stats['fetched'] += fetched
+        stats['marginal'] += marginal
+        stats['new'] += new
+
+    def finish_run(self):
+        """Persist this run's stats"""
+        # Queries cut off by the page budget (or only seeing 304s) taught us nothing
+        stats = [s for s in self.run_stats.values() if s['skipped'] or s['pages']]
+        if self.db and stats:
+            self.db.add_query_stats(stats)
+        self.run_stats = {}
+
+    @staticmethod
+    def _empty_stats(key: str, skipped: bool = False) -> Dict:
+        return {'query_key': key, 'skipped': skipped, 'pages': 0, 'fetched': 0, 'marginal': 0, 'new': 0}
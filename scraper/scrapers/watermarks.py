@@ -0,0 +1,112 @@
+import hashlib
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from config.settings import WATERMARK_MAX_AGE_DAYS, WATERMARK_OVERLAP_HOURS
+from scraper.database.models import JobDatabase
+
+class Watermarks:
+    """Per-query high-water marks of one source, so a run only fetches what is new.
+
+    For every query (a LinkedIn keyword search, a custom URL) the source_state
+    table keeps the newest posting date and job seen, a fingerprint of the
+    query's first results page, and when the query last finished without
+    errors. Scrapers use them to ask only for postings since that run (plus
+    an overlap, as posting dates are only known to the day), to stop paging
+    once results reach the watermark, and to skip a first page identical to
+    last time. A watermark is only moved forward for queries that finished
+    cleanly (not cut short by an error or the page budget), and only by
+    ``save``, which scrapers call once the run's jobs are stored, so a failed
+    run is retried in full next time.
+    """
+
+    def __init__(self, db: JobDatabase, source: str, enabled: bool = True,
+                 overlap_hours: float = WATERMARK_OVERLAP_HOURS,
+                 max_age_days: float = WATERMARK_MAX_AGE_DAYS):
+        self.db = db
+        self.source = source
+        self.enabled = enabled and db is not None
+        self.overlap = timedelta(hours=overlap_hours)
+        self.max_age = timedelta(days=max_age_days)
+        self.states: Dict[str, Dict] = db.get_source_state(source) if self.enabled else {}
+        self.run_states: Dict[str, Dict] = {}
+
+    @staticmethod
+    def fingerprint(jobs: List[Dict]) -> str:
+        """Fingerprint of a results page: the job IDs on it, in order"""
+        return hashlib.md5('\n'.join(job['job_id'] for job in jobs).encode()).hexdigest()
+
+    def window(self, key: str) -> Optional[timedelta]:
+        """How far back this run needs to look for the query, or None for a full scrape"""
+        state = self.states.get(key)
+        if not self.enabled or not state or not state.get('last_success_at'):
+            return None
+        # last_success_at is SQLite's CURRENT_TIMESTAMP, in UTC
+        age = datetime.utcnow() - datetime.fromisoformat(state['last_success_at'])
+        if age > self.max_age:
+            return None
+        return max(age, timedelta(0)) + self.overlap
+
+    def unchanged(self, key: str, jobs: List[Dict]) -> bool:
+        """Whether a query's first page lists exactly the jobs it listed last time, all of them stored"""
+        state = self.states.get(key)
+        if not self.enabled or not jobs or not state or state.get('fingerprint') != self.fingerprint(jobs):
+            return False
+        seen = self.db.seen_index
+        return all(job['job_id'] in seen for job in jobs)
+
+    def reached(self, key: str, jobs: List[Dict]) -> bool:
+        """Whether a page (newest first) already goes back past the query's watermark"""
+        state = self.states.get(key)
+        if not self.enabled or not state:
+            return False
+        newest_date, newest_id = state.get('newest_posted_date'), state.get('newest_job_id')
+        return any(
+            job['job_id'] == newest_id or (newest_date and job.get('posted_date') and job['posted_date'] < newest_date)
+            for job in jobs
+        )
+
+    def observe(self, key: str, jobs: List[Dict], first_page: bool = False):
+        """Take a fetched page into account for the query's next watermark"""
+        state = self.run_states.setdefault(key, {
+            'source': self.source,
+            'query_key': key,
+            'newest_posted_date': None,
+            'newest_job_id': None,
+            'fingerprint': None,
+            'failed': False
+        })
+        if first_page:
+            state['fingerprint'] = self.fingerprint(jobs)
+        for job in jobs:
+            posted = job.get('posted_date')
+            if posted and (state['newest_posted_date'] is None or posted > state['newest_posted_date']):
+                state['newest_posted_date'], state['newest_job_id'] = posted, job['job_id']
+
+    def fail(self, key: str):
+        """Keep the query's old watermark: part of it could not be fetched or parsed"""
+        self.observe(key, [])
+        self.run_states[key]['failed'] = True
+
+    def save(self):
+        """Persist the watermarks of queries that finished cleanly this run"""
+        states = []
+        for key, state in self.run_states.items():
+            if state['failed']:
+                continue
+            state = dict(state)
+            del state['failed']
+            # A query that only returned undated or older postings keeps its previous mark
+            previous = self.states.get(key) or {}
+            if previous.get('newest_posted_date') and (
+                    state['newest_posted_date'] is None
+                    or previous['newest_posted_date'] > state['newest_posted_date']):
+                state['newest_posted_date'] = previous['newest_posted_date']
+                state['newest_job_id'] = previous.get('newest_job_id')
+            if state['fingerprint'] is None:
+                state['fingerprint'] = previous.get('fingerprint')
+            states.append(state)
+
+        if self.enabled and states:
+            self.db.save_source_state(states)
+        self.run_states = {}
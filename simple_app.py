@@ -1,98 +1,114 @@
 from flask import Flask, render_template, jsonify, request
-import sqlite3
 from datetime import datetime
 import os
 from pathlib import Path
 
+from config.settings import DATABASE_PATH
+from scraper.database.archive import get_job_archive
+from scraper.database.connection import get_connection_manager
+from scraper.database.models import JobDatabase
+from scraper.database.pagination import encode_cursor, jobs_page_query
+from scraper.database.search import search_jobs
+from scraper.database.stats import read_job_stats, read_keyword_yield
+
 app = Flask(__name__)
 
+JobDatabase(DATABASE_PATH)  # creates the tables and search index if they are missing
+db_connections = get_connection_manager(DATABASE_PATH)
+
 def get_db_connection():
-    """Create a database connection"""
-    db_path = 'data/jobs.db'
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Get this thread's persistent read connection"""
+    return db_connections.reader()
 
-def get_jobs(limit=None, offset=0, filter_new=False):
-    """Get jobs from database"""
+def get_jobs(limit=20, cursor=None, filter_new=False, country=None, province=None, remote_only=False):
+    """Get a page of jobs, newest first, and the cursor of the next page (None at the end)"""
     conn = get_db_connection()
     
-    query = """
-    SELECT 
+    columns = """
+        id,
         job_id,
         title,
         company,
         location,
+        city,
+        province_code,
+        country,
+        is_remote,
         description,
         url,
         source,
         scraped_date as created_at,
         is_new
-    FROM jobs
     """
     
-    if filter_new:
-        query += " WHERE is_new = 1"
-    
-    query += " ORDER BY created_at DESC"
+    # One walk down the index for the filters, no sort or skip (see jobs_page_query)
+    query, params = jobs_page_query(columns, limit, cursor, filter_new, country, province, remote_only)
+    rows = conn.execute(query, params).fetchall()
+    jobs = [dict(row) for row in rows[:limit]]
     
-    if limit:
-        query += f" LIMIT {limit} OFFSET {offset}"
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor([jobs[-1]['created_at'], jobs[-1]['id']])
+    for job in jobs:
+        del job['id']
     
-    cursor = conn.execute(query)
-    jobs = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    
-    return jobs
+    return jobs, next_cursor
 
 def get_job_stats():
-    """Get job statistics"""
-    conn = get_db_connection()
-    
-    # Total jobs
-    total = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
-    
-    # New jobs
-    new_jobs = conn.execute("SELECT COUNT(*) FROM jobs WHERE is_new = 1").fetchone()[0]
-    
-    # Jobs by source
-    sources = conn.execute("""
-        SELECT source, COUNT(*) as count 
-        FROM jobs 
-        GROUP BY source 
-        ORDER BY count DESC
-    """).fetchall()
-    
-    conn.close()
-    
-    return {
-        'total': total,
-        'new_jobs': new_jobs,
-        'sources': [dict(row) for row in sources]
-    }
+    """Get job statistics from the trigger-maintained rollup"""
+    return read_job_stats(get_db_connection())
 
 @app.route('/')
 def index():
     """Main page showing job dashboard"""
     stats = get_job_stats()
-    recent_jobs = get_jobs(limit=10)
+    recent_jobs, _ = get_jobs(limit=10)
     return render_template('index.html', stats=stats, recent_jobs=recent_jobs)
 
 @app.route('/api/jobs')
 def api_jobs():
     """API endpoint to get jobs"""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
+    per_page = max(1, min(request.args.get('per_page', 20, type=int), 100))
+    cursor = request.args.get('cursor')
     filter_new = request.args.get('new_only', 'false').lower() == 'true'
+    country = request.args.get('country')
+    province = request.args.get('province')
+    remote_only = request.args.get('remote_only', 'false').lower() == 'true'
     
-    offset = (page - 1) * per_page
-    jobs = get_jobs(limit=per_page, offset=offset, filter_new=filter_new)
+    try:
+        jobs, next_cursor = get_jobs(limit=per_page, cursor=cursor, filter_new=filter_new,
+                                     country=country, province=province, remote_only=remote_only)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     return jsonify({
         'jobs': jobs,
-        'page': page,
         'per_page': per_page,
-        'has_more': len(jobs) == per_page
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None
+    })
+
+@app.route('/api/search')
+def api_search():
+    """API endpoint for full-text job search (q, limit, cursor, archive)"""
+    query = request.args.get('q', '')
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    cursor = request.args.get('cursor')
+    archive = request.args.get('archive', 'false').lower() == 'true'
+    
+    try:
+        if archive:
+            results = get_job_archive().search(query, limit, cursor)
+        else:
+            results = search_jobs(get_db_connection(), query, limit, cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'query': query,
+        'archive': archive,
+        'jobs': results['jobs'],
+        'next_cursor': results['next_cursor']
     })
 
 @app.route('/api/stats')
@@ -100,22 +116,28 @@ def api_stats():
     """API endpoint to get statistics"""
     return jsonify(get_job_stats())
 
+@app.route('/api/stats/yield')
+def api_keyword_yield():
+    """API endpoint for jobs found per source and keyword (days, source)"""
+    days = request.args.get('days', type=int)
+    source = request.args.get('source')
+    return jsonify({
+        'days': days,
+        'yield': read_keyword_yield(get_db_connection(), days, source)
+    })
+
 @app.route('/api/mark-seen/<job_id>')
 def mark_seen(job_id):
     """Mark a job as seen (not new)"""
-    conn = get_db_connection()
-    conn.execute("UPDATE jobs SET is_new = 0 WHERE job_id = ?", (job_id,))
-    conn.commit()
-    conn.close()
+    with db_connections.writer() as conn:
+        conn.execute("UPDATE jobs SET is_new = 0 WHERE job_id = ?", (job_id,))
     return jsonify({'success': True})
 
 @app.route('/api/mark-all-seen')
 def mark_all_seen():
     """Mark all jobs as seen"""
-    conn = get_db_connection()
-    conn.execute("UPDATE jobs SET is_new = 0")
-    conn.commit()
-    conn.close()
+    with db_connections.writer() as conn:
+        conn.execute("UPDATE jobs SET is_new = 0")
     return jsonify({'success': True})
 
 @app.route('/api/run-scraper', methods=['POST'])
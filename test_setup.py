@@ -120,6 +120,398 @@ def test_database_initialization():
         print(f"❌ Error initializing database: {e}")
         return False
 
+def test_parser_backends():
+    """Test that every HTML parser backend matches the original LinkedIn card output"""
+    print("\n🧩 Testing HTML parser backends...")
+    
+    sample_page = """
+    <html><head><meta charset="utf-8"></head><body><ul>
+      <li><div class="base-card relative job-search-card">
+        <a class="base-card__full-link" href="https://ca.linkedin.com/jobs/view/intern-at-acme-123?refId=a&amp;trackingId=b"></a>
+        <h3 class="base-search-card__title">  Data Science Intern — Summer 2026 </h3>
+        <h4 class="base-search-card__subtitle"><a href="#">Acme <b>Capital</b> &amp; Co</a></h4>
+        <span class="job-search-card__location">Montréal, Quebec, Canada</span>
+        <time class="job-search-card__listdate" datetime="2026-10-01">2 weeks ago</time>
+      </div></li>
+      <li><div class="base-card">
+        <h3 class="base-search-card__title">Co-op Student<!-- hidden --></h3>
+        <a class="base-card__full-link"></a>
+      </div></li>
+    </ul></body></html>
+    """.encode('utf-8')
+    
+    try:
+        from scraper.parsing.backends import check_parity
+        
+        passed = True
+        for backend, mismatches in check_parity(sample_page).items():
+            if mismatches:
+                print(f"❌ {backend} differs from the original output: {mismatches}")
+                passed = False
+            else:
+                print(f"✅ {backend} matches the original output")
+        
+        return passed
+        
+    except Exception as e:
+        print(f"❌ Error checking parser backends: {e}")
+        return False
+
+def test_query_plans():
+    """Test that the hot database queries use the indexes the migrations create"""
+    print("\n🗂️ Testing query plans...")
+    
+    try:
+        import tempfile
+        from scraper.database.models import JobDatabase
+        from scraper.database.migrations import HOT_QUERIES, check_query_plans
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            db = JobDatabase(os.path.join(tmp, 'jobs.db'))
+            problems = check_query_plans(db.connections.reader())
+            db.connections.close()
+        
+        for problem in problems:
+            print(f"❌ {problem['query']}: expected {problem['expected']}, got {' | '.join(problem['plan'])}")
+        if not problems:
+            print(f"✅ All {len(HOT_QUERIES)} hot queries use their indexes")
+        return not problems
+        
+    except Exception as e:
+        print(f"❌ Error checking query plans: {e}")
+        return False
+
+def test_search_latency():
+    """Test that searches stay fast on a realistically sized table and rank selective matches in full"""
+    print("\n🔎 Testing search latency...")
+    
+    try:
+        import tempfile
+        import time
+        from scraper.database.models import JobDatabase
+        from scraper.database.search import search_jobs
+        
+        titles = ['Software Engineering Intern', 'Data Science Intern', 'Quant Research Intern',
+                  'Machine Learning Intern', 'Product Design Intern']
+        cities = ['Toronto, Ontario, Canada', 'Montréal, Quebec, Canada', 'Vancouver, British Columbia, Canada', 'Remote']
+        postings = [(f'bench-{i}', titles[i % 5], f'Company {i % 997}', cities[i % 4],
+                     f'{titles[i % 5]} role {i} building internal tools', f'https://example.com/jobs/{i}')
+                    for i in range(20000)]
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            db = JobDatabase(os.path.join(tmp, 'jobs.db'))
+            with db.connections.writer() as conn:
+                conn.executemany('''
+                    INSERT INTO jobs (job_id, title, company, location, description, url, source)
+                    VALUES (?, ?, ?, ?, ?, ?, 'linkedin')
+                ''', postings)
+            
+            conn = db.connections.reader()
+            timings = {}
+            for text in ('intern', 'softw', 'quant intern tor'):
+                search_jobs(conn, text)
+                started = time.perf_counter()
+                results = search_jobs(conn, text)
+                timings[text] = (time.perf_counter() - started) * 1000
+                if len(results['jobs']) != 20:
+                    print(f"❌ {text!r} returned {len(results['jobs'])} jobs")
+                    return False
+            
+            # 1000 matches fit in the candidate window, so they are ranked exactly like a full search
+            page = search_jobs(conn, 'quant intern tor')
+            following = search_jobs(conn, 'quant intern tor', cursor=page['next_cursor'])
+            full = [row[0] for row in conn.execute('''
+                SELECT jobs.job_id FROM jobs_fts JOIN jobs ON jobs.id = jobs_fts.rowid
+                WHERE jobs_fts MATCH '"quant" AND "intern" AND "tor"*' ORDER BY rank, jobs.id LIMIT 40
+            ''')]
+            db.connections.close()
+        
+        got = [job['job_id'] for job in page['jobs'] + following['jobs']]
+        if got != full:
+            print(f"❌ Search ranked {got[:5]}..., a full ranking gives {full[:5]}...")
+            return False
+        
+        slow = {text: ms for text, ms in timings.items() if ms > 100}
+        if slow:
+            print(f"❌ Searches over 100 ms on {len(postings)} jobs: {slow}")
+            return False
+        print(f"✅ Searched {len(postings)} jobs in "
+              + ', '.join(f"{text!r} {ms:.1f} ms" for text, ms in timings.items()))
+        return True
+    
+    except Exception as e:
+        print(f"❌ Error checking search latency: {e}")
+        return False
+
+def test_job_filters():
+    """Test that the filters block of job_sources.yaml compiles and sorts sample postings"""
+    print("\n🎯 Testing job filters...")
+    
+    try:
+        import yaml
+        from scraper.filtering.job_filter import JobFilter
+        
+        with open('config/job_sources.yaml', 'r') as f:
+            job_filter = JobFilter(yaml.safe_load(f).get('filters'))
+        
+        samples = [
+            ({'title': 'Software Engineering Intern', 'location': 'Toronto, Ontario, Canada'}, None),
+            ({'title': 'Senior Data Engineer', 'location': 'Toronto, Ontario, Canada'}, 'excluded_keywords'),
+            ({'title': 'Summer Analyst', 'location': 'New York, NY'}, 'locations'),
+        ]
+        failures = 0
+        for job, expected in samples:
+            reason = job_filter.check(job)
+            if (reason.split(':')[0] if reason else None) != expected:
+                print(f"❌ {job['title']} ({job['location']}): expected {expected}, got {reason}")
+                failures += 1
+        if not failures:
+            print(f"✅ Filters compiled: {', '.join(sorted(job_filter.rules))}")
+        return not failures
+        
+    except Exception as e:
+        print(f"❌ Error checking job filters: {e}")
+        return False
+
+def test_baseline_migration():
+    """Test that a database from before versioned migrations keeps its new/seen flags when upgraded"""
+    print("\n🧬 Testing migration of a baseline database...")
+    
+    try:
+        import hashlib
+        import sqlite3
+        import tempfile
+        from scraper.database.models import JobDatabase
+        
+        # Same posting stored twice under tracking-parameter URLs, as the original scraper did
+        postings = [
+            ('Data Intern', 'Acme', 'https://ca.linkedin.com/jobs/view/data-intern-at-acme-101?trk=a', 1),
+            ('Data Intern', 'Acme', 'https://ca.linkedin.com/jobs/view/data-intern-at-acme-101?trk=b', 1),
+            ('ML Intern', 'Initech', 'https://ca.linkedin.com/jobs/view/ml-intern-at-initech-102?trk=a', 0),
+            ('ML Intern', 'Initech', 'https://ca.linkedin.com/jobs/view/ml-intern-at-initech-102?trk=b', 1),
+            ('Quant Intern', 'Globex', 'https://ca.linkedin.com/jobs/view/quant-intern-at-globex-103', 1),
+        ]
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'jobs.db')
+            with sqlite3.connect(path) as conn:
+                conn.execute('''
+                    CREATE TABLE jobs (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        job_id TEXT UNIQUE,
+                        title TEXT NOT NULL,
+                        company TEXT NOT NULL,
+                        location TEXT,
+                        salary_min REAL,
+                        salary_max REAL,
+                        description TEXT,
+                        url TEXT NOT NULL,
+                        source TEXT NOT NULL,
+                        posted_date TEXT,
+                        scraped_date TEXT DEFAULT CURRENT_TIMESTAMP,
+                        is_new BOOLEAN DEFAULT 1,
+                        applied BOOLEAN DEFAULT 0,
+                        metadata TEXT
+                    )
+                ''')
+                conn.executemany('''
+                    INSERT INTO jobs (job_id, title, company, location, url, source, is_new, metadata)
+                    VALUES (?, ?, ?, 'Toronto, Ontario, Canada', ?, 'linkedin', ?, '{}')
+                ''', [(hashlib.md5(f"{title}_{company}_{url}".encode()).hexdigest(), title, company, url, is_new)
+                      for title, company, url, is_new in postings])
+            
+            db = JobDatabase(path)
+            rows = db.connections.reader().execute(
+                'SELECT title, is_new, duplicate_of FROM jobs ORDER BY id'
+            ).fetchall()
+            db.connections.close()
+        
+        # One row per posting; a copy the user had seen marks the job seen, otherwise it stays new
+        got = [(row['title'], row['is_new'], row['duplicate_of']) for row in rows]
+        expected = [('Data Intern', 1, None), ('ML Intern', 0, None), ('Quant Intern', 1, None)]
+        if got != expected:
+            print(f"❌ Expected {expected}, got {got}")
+            return False
+        print(f"✅ {len(postings)} baseline rows migrated to {len(got)} jobs, "
+              f"{sum(row[1] for row in got)} still new")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Error migrating a baseline database: {e}")
+        return False
+
+def test_archive():
+    """Test that old jobs move to the archive, leave an ID stub behind and are not stored again"""
+    print("\n🗄️ Testing job archiving...")
+    
+    try:
+        import tempfile
+        from scraper.database.archive import JobArchive
+        from scraper.database.models import JobDatabase
+        
+        old_job = {'job_id': 'archive-old', 'title': 'Data Intern', 'company': 'Acme',
+                   'location': 'Toronto, Ontario, Canada', 'url': 'https://example.com/jobs/1', 'source': 'linkedin'}
+        new_job = dict(old_job, job_id='archive-new', title='ML Intern', url='https://example.com/jobs/2')
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            db = JobDatabase(os.path.join(tmp, 'jobs.db'))
+            db.store_jobs([old_job, new_job])
+            with db.connections.writer() as conn:
+                conn.execute("UPDATE jobs SET scraped_date = '2020-01-01 00:00:00' WHERE job_id = ?", (old_job['job_id'],))
+            
+            archive = JobArchive(os.path.join(tmp, 'archive.db'))
+            moved = archive.archive_old_jobs(db, older_than_days=180)
+            
+            conn = db.connections.reader()
+            hot = [row[0] for row in conn.execute('SELECT job_id FROM jobs ORDER BY id')]
+            stubs = [row[0] for row in conn.execute('SELECT job_id FROM archived_ids')]
+            archived = [job['job_id'] for job in archive.iter_jobs()]
+            stored_again = db.store_jobs([old_job])
+            hot_after = [row[0] for row in conn.execute('SELECT job_id FROM jobs ORDER BY id')]
+            
+            for connections in (db.connections, archive.connections):
+                connections.close()
+        
+        checks = {
+            'one job moved': moved == 1,
+            'only the new job stays in the hot table': hot == hot_after == [new_job['job_id']],
+            'the old job is in the archive': archived == [old_job['job_id']],
+            'an ID stub is left behind': stubs == [old_job['job_id']],
+            'the archived job is not stored again': stored_again == [],
+        }
+        failed = [check for check, ok in checks.items() if not ok]
+        if failed:
+            print(f"❌ Archiving failed: {', '.join(failed)}")
+            return False
+        print(f"✅ Archived {moved} old job; the new one stayed and re-ingest was rejected")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Error checking job archiving: {e}")
+        return False
+
+def test_stats_rollup():
+    """Test that the job_stats triggers agree with a full recount after inserts, updates and deletes"""
+    print("\n📈 Testing the stats rollup...")
+    
+    try:
+        import tempfile
+        from scraper.database.models import JobDatabase
+        
+        jobs = [
+            {'job_id': f'stats-{i}', 'title': f'Intern {i}', 'company': 'Acme', 'location': location,
+             'url': f'https://example.com/jobs/{i}', 'source': source}
+            for i, (location, source) in enumerate([
+                ('Toronto, Ontario, Canada', 'linkedin'), ('Montréal, Quebec, Canada', 'linkedin'),
+                ('Remote', 'custom_acme'), ('New York, NY, United States', 'custom_acme'),
+            ])
+        ]
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            db = JobDatabase(os.path.join(tmp, 'jobs.db'))
+            steps = {}
+            
+            db.store_jobs(jobs)
+            steps['insert'] = db.check_stats()
+            
+            db.mark_jobs_as_processed(['stats-0', 'stats-2'])
+            steps['is_new update'] = db.check_stats()
+            
+            with db.connections.writer() as conn:
+                # A job re-dated and moved to another province, as a rescrape or backfill would
+                conn.execute('''
+                    UPDATE jobs SET scraped_date = '2026-01-01 00:00:00', province_code = 'BC'
+                    WHERE job_id = 'stats-1'
+                ''')
+            steps['date and province update'] = db.check_stats()
+            
+            with db.connections.writer() as conn:
+                conn.execute("DELETE FROM jobs WHERE job_id IN ('stats-0', 'stats-3')")
+            steps['delete'] = db.check_stats()
+            
+            totals = db.connections.reader().execute(
+                "SELECT total_count, new_count FROM job_stats WHERE scope = 'all'"
+            ).fetchone()
+            db.connections.close()
+        
+        failed = {step: mismatches for step, mismatches in steps.items() if mismatches}
+        for step, mismatches in failed.items():
+            print(f"❌ Rollup out of date after {step}: {mismatches}")
+        if tuple(totals) != (2, 1):
+            print(f"❌ Expected 2 jobs, 1 new in the rollup, got {tuple(totals)}")
+            return False
+        if failed:
+            return False
+        print(f"✅ Rollup matched a full recount after {', '.join(steps)}")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Error checking the stats rollup: {e}")
+        return False
+
+def test_record_replay():
+    """Test that a recorded run can be replayed from its snapshots while watermarks are stored"""
+    print("\n🔁 Testing record and replay with watermarks...")
+    
+    try:
+        import tempfile
+        import requests
+        from main import JobScraper
+        from scraper.fetching.fetcher import AsyncFetcher
+        from scraper.fetching.snapshots import SnapshotStore
+        
+        search_params = {'keywords': ['data'], 'locations': ['Canada'],
+                         'experience_levels': ['internship'], 'max_pages': 1}
+        card = """<li><div class="base-card">
+          <a class="base-card__full-link" href="https://ca.linkedin.com/jobs/view/data-intern-at-acme-{0}"></a>
+          <h3 class="base-search-card__title">Data Intern {0}</h3>
+          <h4 class="base-search-card__subtitle">Acme</h4>
+          <span class="job-search-card__location">Toronto, Ontario, Canada</span>
+          <time class="job-search-card__listdate" datetime="2026-10-01"></time>
+        </div></li>"""
+        
+        class FakeSession:
+            """Stands in for the network: every search returns the same results page"""
+            def get(self, url, headers=None, timeout=None):
+                response = requests.Response()
+                response.status_code = 200
+                response.url = url
+                response._content = ('<ul>' + ''.join(card.format(i) for i in range(3)) + '</ul>').encode()
+                return response
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SnapshotStore(os.path.join(tmp, 'snapshots'))
+            recorder = JobScraper(db_path=os.path.join(tmp, 'jobs.db'), record=True)
+            linkedin = recorder.scrapers['linkedin']
+            
+            # A previous run left watermarks behind for the recorded search
+            key = linkedin.planner.expand(search_params)[0]['key']
+            recorder.db.save_source_state([{
+                'source': 'linkedin', 'query_key': key, 'newest_posted_date': '2026-09-01',
+                'newest_job_id': None, 'fingerprint': None
+            }])
+            
+            linkedin.fetcher = AsyncFetcher(snapshots=store)
+            linkedin.fetcher._session_for = lambda host: FakeSession()
+            recorded = [job['job_id'] for job in linkedin.scrape_jobs(search_params)]
+            
+            replayer = JobScraper(db_path=os.path.join(tmp, 'replay.db'), replay=True)
+            replayer.scrapers['linkedin'].fetcher = AsyncFetcher(replay=store)
+            replayed = [job['job_id'] for job in replayer.scrapers['linkedin'].scrape_jobs(search_params)]
+            
+            for scraper in (recorder, replayer):
+                scraper.db.connections.close()
+        
+        if not recorded or recorded != replayed:
+            print(f"❌ Recorded {len(recorded)} jobs, replayed {len(replayed)}")
+            return False
+        print(f"✅ Replayed all {len(recorded)} recorded jobs")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Error checking record and replay: {e}")
+        return False
+
 def main():
     """Run all tests"""
     print("🚀 Job Scraper Setup Test\n")
@@ -129,7 +521,15 @@ def main():
         test_imports,
         test_project_structure,
         test_config_loading,
-        test_database_initialization
+        test_database_initialization,
+        test_parser_backends,
+        test_query_plans,
+        test_search_latency,
+        test_job_filters,
+        test_baseline_migration,
+        test_archive,
+        test_stats_rollup,
+        test_record_replay
     ]
     
     passed = 0
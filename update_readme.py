@@ -3,24 +3,27 @@
 README Updater - Automatically updates the README.md with latest scraped jobs
 """
 
-import sqlite3
 import os
 import re
 from datetime import datetime
 import subprocess
 import sys
 
+from scraper.database.connection import get_connection_manager
+from scraper.database.migrations import CANADA_OR_REMOTE_CANONICAL
+from scraper.database.stats import read_job_stats
+
 def get_db_connection():
     """Get database connection"""
     db_path = os.path.join(os.path.dirname(__file__), 'data', 'jobs.db')
-    return sqlite3.connect(db_path)
+    return get_connection_manager(db_path).reader()
 
 def get_latest_jobs(limit=15):
     """Get the latest jobs from database"""
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    query = """
+    query = f"""
     SELECT 
         scraped_date,
         title,
@@ -28,29 +31,14 @@ def get_latest_jobs(limit=15):
         location,
         url,
         'LinkedIn' as source
-    FROM jobs 
-    WHERE location LIKE '%Canada%' 
-       OR location LIKE '%Ontario%'
-       OR location LIKE '%Quebec%'
-       OR location LIKE '%British Columbia%'
-       OR location LIKE '%Alberta%'
-       OR location LIKE '%Manitoba%'
-       OR location LIKE '%Saskatchewan%'
-       OR location LIKE '%Nova Scotia%'
-       OR location LIKE '%New Brunswick%'
-       OR location LIKE '%Newfoundland%'
-       OR location LIKE '%Prince Edward Island%'
-       OR location LIKE '%Northwest Territories%'
-       OR location LIKE '%Nunavut%'
-       OR location LIKE '%Yukon%'
-       OR location LIKE '%Remote%'
+    FROM jobs INDEXED BY idx_canada_recent
+    WHERE {CANADA_OR_REMOTE_CANONICAL}
     ORDER BY scraped_date DESC 
     LIMIT ?
     """
     
     cursor.execute(query, (limit,))
     jobs = cursor.fetchall()
-    conn.close()
     return jobs
 
 def format_date(date_str):
@@ -135,37 +123,15 @@ def get_database_stats():
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    # Total jobs
-    cursor.execute("SELECT COUNT(*) FROM jobs")
-    total_jobs = cursor.fetchone()[0]
-    
-    # Canadian jobs
-    cursor.execute("""
-        SELECT COUNT(*) FROM jobs 
-        WHERE location LIKE '%Canada%' 
-           OR location LIKE '%Ontario%'
-           OR location LIKE '%Quebec%'
-           OR location LIKE '%British Columbia%'
-           OR location LIKE '%Alberta%'
-           OR location LIKE '%Manitoba%'
-           OR location LIKE '%Saskatchewan%'
-           OR location LIKE '%Nova Scotia%'
-           OR location LIKE '%New Brunswick%'
-           OR location LIKE '%Newfoundland%'
-           OR location LIKE '%Prince Edward Island%'
-           OR location LIKE '%Northwest Territories%'
-           OR location LIKE '%Nunavut%'
-           OR location LIKE '%Yukon%'
-           OR location LIKE '%Remote%'
-    """)
-    canadian_jobs = cursor.fetchone()[0]
+    # Total and Canadian jobs, from the trigger-maintained rollup
+    rollup = read_job_stats(conn)
+    total_jobs = rollup['total']
+    canadian_jobs = rollup['canada_or_remote']
     
     # Latest scrape date
     cursor.execute("SELECT MAX(scraped_date) FROM jobs")
     latest_scrape = cursor.fetchone()[0]
     
-    conn.close()
-    
     return {
         'total_jobs': total_jobs,
         'canadian_jobs': canadian_jobs,